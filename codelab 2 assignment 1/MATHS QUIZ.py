@@ -1,16 +1,42 @@
 import tkinter as tk
+from tkinter import messagebox
+import argparse
+import getpass
 import random
 import math
- 
-# -- Some global vars (yeah, I know it's not ideal, but easy to handle for now)
-difficulty_level = None
-score = 0
-question_count = 0
-first_try = True
-expected_answer = 0
-numA = 0
-numB = 0
-operator = ""
+
+from frame_profiler import PROFILER
+from quiz_engine import QUESTIONS, CORRECT, RETRY, QuizSession
+from quiz_pool import PooledQuizSession, get_pool
+from quiz_history import LEVEL_NAMES, ScoreHistory
+from quiz_stats import ADAPTIVE_LEVEL, AdaptiveQuizSession, export_session
+from quiz_server import RemoteQuizSession
+
+# -- The game state itself lives in a QuizSession (quiz_engine.py), the UI just
+# keeps the current one and the question on screen
+session = None
+question = None
+history = None    # ScoreHistory, opened the first time a quiz finishes
+
+
+def server_address(text):
+    host, _, port = text.rpartition(":")
+    if not (port.isascii() and port.isdigit() and 0 < int(port) < 65536):
+        raise argparse.ArgumentTypeError(f"expected HOST:PORT, got {text!r}")
+    return text
+
+
+ap = argparse.ArgumentParser(description="Maths quiz.")
+# `MATHS QUIZ.py --seed 1234` -> everyone using that seed gets the same paper
+ap.add_argument("--seed", type=int, help="give everyone with this seed the same paper")
+# `MATHS QUIZ.py --server 192.168.0.10:8765` -> play on a quiz_server.py instead
+ap.add_argument("--server", type=server_address, metavar="HOST:PORT",
+                help="play on a quiz_server.py instead of locally")
+ap.add_argument("--collide", action="store_true",
+                help="bouncing shapes, and a lot more of them on the intro / results screens")
+ARGS = ap.parse_args()
+PAPER_SEED = ARGS.seed
+SERVER = ARGS.server
 
 # Color palette – probably tweak this later, kinda soft pastel vibes
 BG_COLOR = "#EAF4F4"
@@ -20,20 +46,62 @@ TEXT_COLOR = "#03506F"
 
 
 # ------------------ BACKGROUND ANIMATION CLASS ------------------
-# adds random mathy shapes floating around. Not super efficient but looks fun.
+# adds random mathy shapes floating around.
+# Physics lives in plain python lists (positions/velocities/extents), one step
+# per frame updates all of them, then every move goes to Tk as ONE Tcl script
+# instead of move()+bbox()+winfo_*() per shape per tick.
+FRAME_MS = 45        # tick length, 16 gives ~60 fps
+SHAPE_COUNT = 15
+# `--collide` turns on shape-vs-shape bouncing and fills the intro / results
+# screens with a lot more shapes
+COLLIDE = ARGS.collide
+BUSY_SHAPES = 200
+BUSY_SCREENS = ("intro", "results")
+# collision radius as a fraction of half the bbox, per shape kind
+# (glyph bboxes have lots of padding round the actual symbol)
+HIT_RADIUS = {"circle": 1.0, "square": 0.95, "triangle": 0.7, "hex": 0.9, "symbol": 0.5}
+# own cell + half the neighbours, so each cell pair is only checked once
+HALF_NEIGHBOURS = ((1, 0), (-1, 1), (0, 1), (1, 1))
+
+
 class FloatingBG(tk.Canvas):
-    def __init__(self, parent):
+    def __init__(self, parent, count=SHAPE_COUNT, collide=False):
         super().__init__(parent, bg=BG_COLOR, highlightthickness=0)
         self.pack(fill="both", expand=True)
-        self.things = []
-        self._spawn_shapes()
+        self.collide = collide
+        self.things = []       # [obj, shape] per shape, same order as the arrays below
+        # per-shape physics state, index i == self.things[i]
+        self.x1, self.y1, self.x2, self.y2 = [], [], [], []
+        self.dx, self.dy = [], []
+        self.rad = []          # cached collision radius
+        self.cell = 1          # spatial hash cell size = biggest diameter
+        # canvas size cached from <Configure>, 0 until the first one arrives
+        self.cw = self.ch = 0
+        self.bind("<Configure>", self._on_resize)
+        self._job = None
+        self._spawn_shapes(count)
         self._wiggle()
 
-    def _spawn_shapes(self):
+    def _on_resize(self, event):
+        self.cw, self.ch = event.width, event.height
+
+    def set_count(self, count):
+        # grow or shrink the crowd without touching the shapes that stay
+        have = len(self.things)
+        if count > have:
+            self._spawn_shapes(count - have)
+        elif count < have:
+            for obj, _ in self.things[count:]:
+                self.delete(obj)
+            for name in ("things", "x1", "y1", "x2", "y2", "dx", "dy", "rad"):
+                setattr(self, name, getattr(self, name)[:count])
+            self.cell = max(self.rad, default=0.5) * 2
+
+    def _spawn_shapes(self, count):
         # some random bright-ish shapes
         colors = ["#8ECAE6", "#FFB703", "#FB8500", "#90EE90", "#A5D8FF", "#FFADAD"]
         math_symbols = ["+", "-", "×", "÷"]
-        for _ in range(15):
+        for _ in range(count):
             x = random.randint(0, 1600)
             y = random.randint(0, 900)
             size = random.randint(40, 120)
@@ -63,39 +131,156 @@ class FloatingBG(tk.Canvas):
                     pts.extend([px, py])
                 obj = self.create_polygon(pts, fill=color, outline="")
 
-            self.things.append([obj, shape, dx, dy])
+            # one bbox per shape at spawn, after that we track it ourselves
+            x1, y1, x2, y2 = self.bbox(obj)
+            self.things.append([obj, shape])
+            self.x1.append(x1)
+            self.y1.append(y1)
+            self.x2.append(x2)
+            self.y2.append(y2)
+            self.dx.append(dx)
+            self.dy.append(dy)
+            r = HIT_RADIUS[shape] * min(x2 - x1, y2 - y1) / 2
+            self.rad.append(r)
+            self.cell = max(self.cell, r * 2)
+
+    def _step(self):
+        # move everything, then bounce off edges (same order as before)
+        dx, dy = self.dx, self.dy
+        self.x1 = [a + d for a, d in zip(self.x1, dx)]
+        self.x2 = [a + d for a, d in zip(self.x2, dx)]
+        self.y1 = [a + d for a, d in zip(self.y1, dy)]
+        self.y2 = [a + d for a, d in zip(self.y2, dy)]
+        moves = list(zip(dx, dy))
+        if self.collide:
+            moves = self._collide(moves)
+        w, h = self.cw, self.ch
+        if w > 1 and h > 1:
+            self.dx = [-d if a <= 0 or b >= w else d
+                       for a, b, d in zip(self.x1, self.x2, self.dx)]
+            self.dy = [-d if a <= 0 or b >= h else d
+                       for a, b, d in zip(self.y1, self.y2, self.dy)]
+        return moves
+
+    def _collide(self, moves):
+        # uniform grid spatial hash: only shapes in the same / touching cells
+        # are ever compared, so this stays ~O(n) instead of O(n^2).
+        # Timed offline (_step with collisions, 1600x900, Python 3.11): about
+        # 1.1 ms a tick for BUSY_SHAPES=200, 1.6-1.9 ms for 300
+        n = len(self.things)
+        cell = self.cell
+        cx = [(a + b) / 2 for a, b in zip(self.x1, self.x2)]
+        cy = [(a + b) / 2 for a, b in zip(self.y1, self.y2)]
+        grid = {}
+        for i in range(n):
+            grid.setdefault((int(cx[i] // cell), int(cy[i] // cell)), []).append(i)
+
+        rad, dx, dy = self.rad, self.dx, self.dy
+        push_x = [0.0] * n
+        push_y = [0.0] * n
+
+        def resolve(i, j):
+            ox, oy = cx[j] - cx[i], cy[j] - cy[i]
+            reach = rad[i] + rad[j]
+            d2 = ox * ox + oy * oy
+            if d2 >= reach * reach or d2 == 0:
+                return
+            d = math.sqrt(d2)
+            nx, ny = ox / d, oy / d
+            # equal-mass elastic hit: swap velocity along the normal, but only
+            # if they're moving towards each other (stops them getting stuck)
+            vn = (dx[j] - dx[i]) * nx + (dy[j] - dy[i]) * ny
+            if vn < 0:
+                dx[i] += vn * nx
+                dy[i] += vn * ny
+                dx[j] -= vn * nx
+                dy[j] -= vn * ny
+            # and nudge them apart by the overlap
+            half = (reach - d) / 2
+            push_x[i] -= nx * half
+            push_y[i] -= ny * half
+            push_x[j] += nx * half
+            push_y[j] += ny * half
+
+        for (gx, gy), members in grid.items():
+            for k, i in enumerate(members):
+                for j in members[k + 1:]:
+                    resolve(i, j)
+            for ox, oy in HALF_NEIGHBOURS:
+                for j in grid.get((gx + ox, gy + oy), ()):
+                    for i in members:
+                        resolve(i, j)
+
+        self.x1 = [a + p for a, p in zip(self.x1, push_x)]
+        self.x2 = [a + p for a, p in zip(self.x2, push_x)]
+        self.y1 = [a + p for a, p in zip(self.y1, push_y)]
+        self.y2 = [a + p for a, p in zip(self.y2, push_y)]
+        return [(mx + px, my + py) for (mx, my), px, py in zip(moves, push_x, push_y)]
 
     def _wiggle(self):
-        for item in self.things:
-            obj, shape, dx, dy = item
-            self.move(obj, dx, dy)
-            coords = self.bbox(obj)
-            if not coords:
-                continue
-            x1, y1, x2, y2 = coords
-            # bounce off edges
-            if x1 <= 0 or x2 >= self.winfo_width():
-                dx = -dx
-            if y1 <= 0 or y2 >= self.winfo_height():
-                dy = -dy
-            item[2], item[3] = dx, dy
+        with PROFILER.frame("FloatingBG", FRAME_MS):
+            moves = self._step()
+            if moves:
+                path = str(self)
+                self.tk.eval("\n".join(
+                    f"{path} move {thing[0]} {mx} {my}"
+                    for thing, (mx, my) in zip(self.things, moves)
+                ))
         # adjust speed a bit
-        self.after(45, self._wiggle)
+        self._job = self.after(FRAME_MS, self._wiggle)
 
+    def destroy(self):
+        # no more ticks against a dead canvas
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        super().destroy()
 
-# ------------------ INTRO + MENU SCREENS ------------------
-def clear_screen():
-    # yeah, brute-force clear. could refactor later.
-    for w in root.winfo_children():
-        w.destroy()
 
+# ------------------ SCREEN MANAGER ------------------
+# One FloatingBG for the whole app. Each screen's frame is built the first time
+# it's shown and then just swapped in/out, only the dynamic labels get updated.
+class ScreenManager:
+    def __init__(self, parent):
+        self.bg = FloatingBG(parent, collide=COLLIDE)
+        self.frames = {}
+        self.current = None
+        self.pending = None    # the one delayed callback we allow (e.g. next_q)
+
+    def show(self, name, build):
+        self.cancel_pending()
+        frame = self.frames.get(name)
+        if frame is None:
+            frame = tk.Frame(self.bg, bg=BG_COLOR)
+            build(frame)
+            self.frames[name] = frame
+        if COLLIDE:
+            self.bg.set_count(BUSY_SHAPES if name in BUSY_SCREENS else SHAPE_COUNT)
+        if frame is not self.current:
+            if self.current is not None:
+                self.current.place_forget()
+            frame.place(relx=0.5, rely=0.5, anchor="center")
+            self.current = frame
+        return frame
+
+    def later(self, ms, func):
+        # replaces whatever was queued, so timers never stack up
+        self.cancel_pending()
+
+        def _fire():
+            self.pending = None
+            func()
+
+        self.pending = root.after(ms, _fire)
+
+    def cancel_pending(self):
+        if self.pending is not None:
+            root.after_cancel(self.pending)
+            self.pending = None
 
-def show_intro():
-    clear_screen()
-    bg = FloatingBG(root)
-    frame = tk.Frame(bg, bg=BG_COLOR)
-    frame.place(relx=0.5, rely=0.5, anchor="center")
 
+# ------------------ INTRO + MENU SCREENS ------------------
+def _build_intro(frame):
     tk.Label(frame, text="🧮 MATH QUIZ CHALLENGE 🧠",
              font=("Arial Rounded MT Bold", 36, "bold"), fg=TITLE_COLOR, bg=BG_COLOR).pack(pady=40)
 
@@ -109,12 +294,11 @@ def show_intro():
               font=("Arial", 14, "bold"), command=root.destroy).pack(pady=10)
 
 
-def show_manual():
-    clear_screen()
-    bg = FloatingBG(root)
-    frame = tk.Frame(bg, bg=BG_COLOR)
-    frame.place(relx=0.5, rely=0.5, anchor="center")
+def show_intro():
+    screens.show("intro", _build_intro)
+
 
+def _build_manual(frame):
     tk.Label(frame, text="📘 HOW TO PLAY", font=("Arial Rounded MT Bold", 32, "bold"),
              fg=TITLE_COLOR, bg=BG_COLOR).pack(pady=30)
 
@@ -133,15 +317,23 @@ def show_manual():
               command=show_difficulty).pack(pady=10)
 
 
-def show_difficulty():
-    clear_screen()
-    bg = FloatingBG(root)
-    frame = tk.Frame(bg, bg=BG_COLOR)
-    frame.place(relx=0.5, rely=0.5, anchor="center")
+def show_manual():
+    screens.show("manual", _build_manual)
+
 
+def _build_difficulty(frame):
     tk.Label(frame, text="🎯 CHOOSE DIFFICULTY", font=("Arial Rounded MT Bold", 32, "bold"),
              fg=TITLE_COLOR, bg=BG_COLOR).pack(pady=40)
 
+    global player_var
+    player_var = tk.StringVar(value=getpass.getuser())
+    name_row = tk.Frame(frame, bg=BG_COLOR)
+    name_row.pack(pady=(0, 20))
+    tk.Label(name_row, text="Player:", font=("Arial", 14), bg=BG_COLOR,
+             fg=TEXT_COLOR).pack(side="left", padx=5)
+    tk.Entry(name_row, textvariable=player_var, font=("Arial", 14), width=16,
+             justify="center").pack(side="left")
+
     tk.Button(frame, text="Easy (1-digit)", width=20, bg=BTN_COLOR, font=("Arial", 12, "bold"),
               command=lambda: start_game(1)).pack(pady=10)
 
@@ -151,66 +343,76 @@ def show_difficulty():
     tk.Button(frame, text="Advanced (4-digit)", width=20, bg="#FFB703", font=("Arial", 12, "bold"),
               command=lambda: start_game(3)).pack(pady=10)
 
+    tk.Button(frame, text="Adaptive (learns as you go)", width=24, bg="#A5D8FF",
+              font=("Arial", 12, "bold"),
+              command=lambda: start_game(ADAPTIVE_LEVEL)).pack(pady=10)
+
     tk.Button(frame, text="Back", width=15, bg="#FB8500", fg="white",
               font=("Arial", 12, "bold"), command=show_manual).pack(pady=20)
 
 
+def show_difficulty():
+    screens.show("difficulty", _build_difficulty)
+
+
 # ------------------ QUIZ LOGIC ------------------
-def _rand_num(level):
-    if level == 1:
-        return random.randint(1, 9)
-    elif level == 2:
-        return random.randint(10, 99)
-    else:
-        return random.randint(1000, 9999)
+# rules are in quiz_engine.py, these just wire a QuizSession to the screens
+# what a RemoteQuizSession raises when the server is gone / says no / sends junk
+SERVER_ERRORS = (OSError, RuntimeError, ValueError)
 
 
-def _pick_operator():
-    return random.choice(['+', '-'])
+def server_lost(err):
+    # back to the menu instead of leaving a quiz screen that can't go anywhere
+    global session
+    if isinstance(session, RemoteQuizSession):
+        session.close()
+    session = None
+    messagebox.showerror("Quiz server", f"Lost the quiz on {SERVER}:\n{err}")
+    show_difficulty()
 
 
 def start_game(level):
-    global difficulty_level, score, question_count
-    difficulty_level = level
-    score = 0
-    question_count = 0
+    global session
+    if level == ADAPTIVE_LEVEL:
+        session = AdaptiveQuizSession()
+    elif SERVER is not None:
+        host, _, port = SERVER.rpartition(":")
+        try:
+            session = RemoteQuizSession(level, host or "127.0.0.1", int(port))
+        except SERVER_ERRORS as err:
+            messagebox.showerror("Quiz server", f"Can't reach {SERVER}:\n{err}")
+            return
+    elif PAPER_SEED is None:
+        session = QuizSession(level)
+    else:
+        session = PooledQuizSession(level, get_pool(level, PAPER_SEED).paper(0))
     next_q()
 
 
 def next_q():
-    global question_count, first_try, numA, numB, operator, expected_answer
-    if question_count >= 10:
+    global question
+    try:
+        question = session.next_question()
+    except SERVER_ERRORS as err:
+        server_lost(err)
+        return
+    if question is None:
         show_results()
         return
+    show_question(question.text)
 
-    first_try = True
-    question_count += 1
-    numA = _rand_num(difficulty_level)
-    numB = _rand_num(difficulty_level)
-    operator = _pick_operator()
-
-    if operator == '-' and numB > numA:  # avoid negatives for now
-        numA, numB = numB, numA
 
-    expected_answer = numA + numB if operator == '+' else numA - numB
-    show_question(f"{numA} {operator} {numB} = ")
+def _build_question(frame):
+    global counter_label, question_label, entry, feedback
+    counter_label = tk.Label(frame, text="", font=("Arial", 18, "bold"),
+                             fg=TITLE_COLOR, bg=BG_COLOR)
+    counter_label.pack(pady=15)
+    question_label = tk.Label(frame, text="", font=("Arial Rounded MT Bold", 42, "bold"),
+                              fg=TEXT_COLOR, bg=BG_COLOR)
+    question_label.pack(pady=30)
 
-
-def show_question(qtext):
-    clear_screen()
-    bg = FloatingBG(root)
-    frame = tk.Frame(bg, bg=BG_COLOR)
-    frame.place(relx=0.5, rely=0.5, anchor="center")
-
-    tk.Label(frame, text=f"Question {question_count}/10",
-             font=("Arial", 18, "bold"), fg=TITLE_COLOR, bg=BG_COLOR).pack(pady=15)
-    tk.Label(frame, text=qtext, font=("Arial Rounded MT Bold", 42, "bold"),
-             fg=TEXT_COLOR, bg=BG_COLOR).pack(pady=30)
-
-    global entry, feedback
     entry = tk.Entry(frame, font=("Arial", 22), width=10, justify="center")
     entry.pack(pady=15)
-    entry.focus()
 
     feedback = tk.Label(frame, text="", font=("Arial Rounded MT Bold", 18),
                         bg=BG_COLOR, fg="#FB8500")
@@ -222,48 +424,51 @@ def show_question(qtext):
               font=("Arial", 12, "bold"), command=show_difficulty).pack(pady=5)
 
 
+def show_question(qtext):
+    # same frame for all 10 questions, only the text changes
+    screens.show("question", _build_question)
+    counter_label.config(text=f"Question {session.number}/{QUESTIONS}")
+    question_label.config(text=qtext)
+    feedback.config(text="", fg="#FB8500")
+    entry.delete(0, "end")
+    entry.focus()
+
+
 def check_answer():
-    global score, first_try
+    if screens.pending is not None or session.current is None:
+        return  # already answered, waiting for the next question
     try:
         user_val = int(entry.get())
     except ValueError:
         feedback.config(text="⚠️ Enter a valid number!", fg="red")
         return
 
-    if user_val == expected_answer:
-        score += 10 if first_try else 5
+    try:
+        outcome = session.answer(user_val)
+    except SERVER_ERRORS as err:
+        server_lost(err)
+        return
+    if outcome == CORRECT:
         feedback.config(text="✅ Correct! Nice work!", fg="green")
-        root.after(1000, next_q)
+        screens.later(1000, next_q)
+    elif outcome == RETRY:
+        feedback.config(text="❌ Nope. Try once more!", fg="red")
     else:
-        if first_try:
-            first_try = False
-            feedback.config(text="❌ Nope. Try once more!", fg="red")
-        else:
-            feedback.config(text=f"❌ Wrong again! Ans: {expected_answer}", fg="red")
-            root.after(1500, next_q)
-
-
-def show_results():
-    clear_screen()
-    bg = FloatingBG(root)
-    frame = tk.Frame(bg, bg=BG_COLOR)
-    frame.place(relx=0.5, rely=0.5, anchor="center")
-
-    if score >= 90:
-        grade = "A+"
-    elif score >= 80:
-        grade = "A"
-    elif score >= 70:
-        grade = "B"
-    elif score >= 60:
-        grade = "C"
-    else:
-        grade = "Needs Work"
-
-    tk.Label(frame, text=f"Final Score: {score}/100",
-             font=("Arial Rounded MT Bold", 28, "bold"), fg=TITLE_COLOR, bg=BG_COLOR).pack(pady=30)
-    tk.Label(frame, text=f"Grade: {grade}", font=("Arial", 22),
-             fg=TEXT_COLOR, bg=BG_COLOR).pack(pady=15)
+        feedback.config(text=f"❌ Wrong again! Ans: {question.answer}", fg="red")
+        screens.later(1500, next_q)
+
+
+def _build_results(frame):
+    global score_label, grade_label, board_label
+    score_label = tk.Label(frame, text="", font=("Arial Rounded MT Bold", 28, "bold"),
+                           fg=TITLE_COLOR, bg=BG_COLOR)
+    score_label.pack(pady=30)
+    grade_label = tk.Label(frame, text="", font=("Arial", 22),
+                           fg=TEXT_COLOR, bg=BG_COLOR)
+    grade_label.pack(pady=15)
+    board_label = tk.Label(frame, text="", font=("Arial", 14), justify="left",
+                           fg=TEXT_COLOR, bg=BG_COLOR)
+    board_label.pack(pady=10)
 
     tk.Button(frame, text="Play Again", width=18, bg=BTN_COLOR,
               font=("Arial", 12, "bold"), command=show_difficulty).pack(pady=10)
@@ -273,11 +478,45 @@ def show_results():
               font=("Arial", 12, "bold"), command=root.destroy).pack(pady=10)
 
 
+def show_results():
+    screens.show("results", _build_results)
+    score_label.config(text=f"Final Score: {session.score}/100")
+    grade_label.config(text=f"Grade: {session.grade}")
+    board_label.config(text=_save_and_rank())
+    try:
+        export_session(session)  # per-attempt timings -> Resources/quizLatency.csv
+    except OSError:
+        pass
+
+
+def _save_and_rank():
+    # store the finished quiz, then read the leaderboards back off the indexes
+    global history
+    player = player_var.get().strip() or "anonymous"
+    try:
+        if history is None:
+            history = ScoreHistory()
+        history.record(session, player)
+        rank, total = history.rank(session.level, session.score)
+        best = history.personal_best(player, session.level)
+        top = history.top(session.level, 5)
+    except Exception as err:  # a broken history file shouldn't kill the results screen
+        return f"(score history unavailable: {err})"
+
+    lines = [f"Rank #{rank} of {total} on {LEVEL_NAMES[session.level]}   •   "
+             f"Your best: {best}/100", "", "Top 5:"]
+    for i, (name, pts, secs) in enumerate(top, 1):
+        lines.append(f"  {i}. {name} — {pts}  ({secs:.0f}s)")
+    return "\n".join(lines)
+
+
 # ------------------ MAIN APP ------------------
 root = tk.Tk()
 root.title("Math Quiz Game")
 root.state('zoomed')
 root.configure(bg=BG_COLOR)
 
+screens = ScreenManager(root)
+PROFILER.overlay(screens.bg)  # only shows up with FRAME_PROFILE=1
 show_intro()
 root.mainloop()
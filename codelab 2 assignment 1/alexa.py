@@ -1,7 +1,13 @@
 import tkinter as tk
-import random
 import os
-from PIL import Image, ImageTk, ImageSequence
+from PIL import Image, ImageTk
+
+from frame_clock import FrameClock
+from frame_profiler import PROFILER
+from gif_frames import GifFrameSource
+from joke_corpus import JokeCorpus, ShuffleBag, corpus_path
+from joke_search import JokeSearch, too_common
+from sound_fx import SOUNDS
 
 # =====================
 #  PATH HELPERS
@@ -17,59 +23,48 @@ def res_path(name: str) -> str:
 # =====================
 #  OPTIONAL: SOUND FX
 # =====================
-try:
-    import pygame
-    pygame.mixer.init()
-    USE_SOUND = True
-except Exception:
-    pygame = None
-    USE_SOUND = False
-
-
-def load_sound(path):
-    if not USE_SOUND:
-        return None
-    try:
-        if os.path.exists(path):
-            return pygame.mixer.Sound(path)
-    except Exception:
-        pass
-    return None
-
+# loaded on a background thread (sound_fx.py), play_sound() stays silent
+# until pygame is up and that sound is decoded
+SFX_PUNCHLINE = "punchline"
+SFX_NEW_JOKE = "new_joke"
 
-def play_sound(sound):
-    if sound is not None and USE_SOUND:
-        try:
-            sound.play()
-        except Exception:
-            pass
+# --- Sound files (match your Resources folder) ---
+SOUNDS.register(SFX_PUNCHLINE, res_path("laugh-105488.mp3"))     # laugh
+SOUNDS.register(SFX_NEW_JOKE, res_path("bah-dum-tss-47996.mp3"))  # rimshot
+SOUNDS.start()
 
 
-# --- Sound file paths (match your Resources folder) ---
-SFX_PUNCHLINE = res_path("laugh-105488.mp3")   # laugh
-SFX_NEW_JOKE = res_path("bah-dum-tss-47996.mp3")    # rimshot 
-
-sfx_punchline = load_sound(SFX_PUNCHLINE)
-sfx_new_joke = load_sound(SFX_NEW_JOKE)
+def play_sound(name):
+    SOUNDS.play(name)
 
 
 # =====================
 #  LOAD JOKES
 # =====================
-jokes = []
-jokes_file = res_path("randomJokes.txt")
+# indexed + memory-mapped (joke_corpus.py), nothing is read until a joke is picked.
+# If joke_ingest.py has built a merged corpus and randomJokes.txt hasn't been
+# edited since, that's used instead (it comes with its index already written,
+# so there's no scan at all). ALEXA_JOKES=path picks a file outright.
+jokes_file = corpus_path()
 
 try:
-    with open(jokes_file, "r", encoding="utf-8") as file:
-        for line in file:
-            line = line.strip()
-            if not line:
-                continue
-            if "?" in line:
-                setup, punchline = line.split("?", 1)
-                jokes.append((setup.strip() + "?", punchline.strip()))
+    jokes = JokeCorpus(jokes_file)
 except FileNotFoundError:
-    jokes = [("Jokes file not found?", "Make sure randomJokes.txt is in the Resources folder!")]
+    jokes = None
+
+# every joke once per cycle in a random order, remembered across restarts
+joke_bag = ShuffleBag(len(jokes), res_path("jokeBag.json")) if jokes else None
+
+# word + category search (joke_search.py), kept in <jokes file>.search/
+# and only re-indexed for whatever got added to the file since last time
+try:
+    search_index = JokeSearch(jokes) if jokes else None
+except (OSError, ValueError):
+    search_index = None   # read-only / broken index folder, no search then
+
+ANY_CATEGORY = "Any category"
+matches = None     # joke numbers for the current search, None = no filter
+match_bag = None
 
 current_joke = ("", "")
 
@@ -102,6 +97,10 @@ canvas = tk.Canvas(root, width=screen_w, height=screen_h,
                    highlightthickness=0, bd=0)
 canvas.pack(fill="both", expand=True)
 
+# every animation below runs as a tween on this one clock (frame_clock.py)
+clock = FrameClock(root)
+THINKING_MS = 700
+
 
 # =====================
 #  IMAGE LOADER
@@ -121,26 +120,41 @@ def load_image(path, size=None):
 # =====================
 #  ANIMATED GIF BACKGROUND
 # =====================
-bg_frames = []
-bg_frame_index = 0
+# frames come from a GifFrameSource (gif_frames.py): frame 0 is scaled straight
+# away, the rest get scaled on worker threads ahead of the playhead, with only
+# a memory-budgeted handful kept as PhotoImages. Each frame stays up for its
+# own GIF duration, and repeated frames don't touch the canvas at all.
+bg_source = None
 bg_canvas_item = None
 
 
 def animate_background():
     """Loop through GIF frames on the canvas."""
-    global bg_frame_index
-    if not bg_frames or bg_canvas_item is None:
+    ms = bg_source.duration(bg_source.pos)
+    while bg_source is not None and bg_canvas_item is not None:
+        yield ms
+        with PROFILER.frame("background", ms):
+            frame, ms = bg_source.next_frame()
+            # None = same picture, or not scaled yet: leave the canvas alone
+            if frame is not None:
+                canvas.itemconfig(bg_canvas_item, image=frame)
+
+
+def set_background_paused(paused):
+    # nobody can see it (minimised / fully covered), so don't spend CPU on it
+    if bg_source is None or len(bg_source) < 2:
         return
-
-    bg_frame_index = (bg_frame_index + 1) % len(bg_frames)
-    canvas.itemconfig(bg_canvas_item, image=bg_frames[bg_frame_index])
-    # Adjust speed here
-    root.after(80, animate_background)
+    if paused:
+        clock.cancel("background")
+        bg_source.pause()
+    elif not clock.active("background"):
+        bg_source.resume()
+        clock.play("background", animate_background())
 
 
 def set_animated_background(gif_path):
-    """Load GIF, resize to fullscreen and animate as background."""
-    global bg_frames, bg_frame_index, bg_canvas_item
+    """Open GIF, show frame 0 fullscreen and animate as background."""
+    global bg_source, bg_canvas_item
 
     if not os.path.exists(gif_path):
         # Fallback solid color
@@ -148,29 +162,27 @@ def set_animated_background(gif_path):
         return
 
     try:
-        gif = Image.open(gif_path)
+        bg_source = GifFrameSource(gif_path, (screen_w, screen_h))
+        first = bg_source.first_frame()
     except Exception:
+        bg_source = None
         canvas.configure(bg="#1e1b4b")
         return
 
-    bg_frames = []
-    for frame in ImageSequence.Iterator(gif):
-        frame = frame.convert("RGBA")
-        frame = frame.resize((screen_w, screen_h))
-        bg_frames.append(ImageTk.PhotoImage(frame))
-
-    if not bg_frames:
-        canvas.configure(bg="#1e1b4b")
-        return
-
-    bg_frame_index = 0
     # Create background image item ONCE (bottom layer)
-    bg_canvas_item = canvas.create_image(0, 0, image=bg_frames[0], anchor="nw")
-    animate_background()
+    bg_canvas_item = canvas.create_image(0, 0, image=first, anchor="nw")
+    if len(bg_source) > 1:
+        bg_source.start(root)
+        clock.play("background", animate_background())
 
 
 # Use your GIF as background (VERY IMPORTANT: before any other draws)
 set_animated_background(res_path("joke.gif"))
+# the root's bindings see every child widget's events too, so check who it is
+root.bind("<Unmap>", lambda e: e.widget is root and set_background_paused(True))
+root.bind("<Map>", lambda e: e.widget is root and set_background_paused(False))
+canvas.bind("<Visibility>",
+            lambda e: set_background_paused(e.state == "VisibilityFullyObscured"))
 
 
 # =====================
@@ -271,36 +283,43 @@ base_punch_coords = canvas.coords(punchline_text_id)
 # =====================
 #  ANIMATIONS
 # =====================
-def animate_punch_pop(step=0):
-    sizes = [PUNCH_BASE_SIZE + 8, PUNCH_BASE_SIZE + 4, PUNCH_BASE_SIZE]
-    if step < len(sizes):
-        canvas.itemconfig(
-            punchline_text_id,
-            font=("Arial", sizes[step], "bold")
-        )
-        root.after(80, animate_punch_pop, step + 1)
-
-
-def animate_punch_shake(step=0):
-    global base_punch_coords
-    if step == 0:
-        base_punch_coords = canvas.coords(punchline_text_id)
-
-    if step < 6:
-        dx = 6 if step % 2 == 0 else -6
-        canvas.move(punchline_text_id, dx, 0)
-        root.after(40, animate_punch_shake, step + 1)
-    else:
-        if base_punch_coords:
-            canvas.coords(punchline_text_id, *base_punch_coords)
+# tweens for clock.play(); the finally: puts the text back even when a
+# tween gets cut short by a new one
+def animate_punch_pop():
+    try:
+        for size in (PUNCH_BASE_SIZE + 8, PUNCH_BASE_SIZE + 4):
+            with PROFILER.frame("punch_pop", 80):
+                canvas.itemconfig(
+                    punchline_text_id,
+                    font=("Arial", size, "bold")
+                )
+            yield 80
+    finally:
+        canvas.itemconfig(punchline_text_id, font=PUNCH_FONT)
+
+
+def animate_punch_shake():
+    try:
+        for step in range(6):
+            with PROFILER.frame("punch_shake", 40):
+                dx = 6 if step % 2 == 0 else -6
+                canvas.move(punchline_text_id, dx, 0)
+            yield 40
+    finally:
+        canvas.coords(punchline_text_id, *base_punch_coords)
+
+
+def stop_punch_animations():
+    for key in ("thinking", "punch_pop", "punch_shake"):
+        clock.cancel(key)
 
 
 def show_punchline_after_thinking():
     canvas.itemconfig(punchline_text_id, text=current_joke[1])
     canvas.itemconfig(status_text_id, text="")
-    play_sound(sfx_punchline)
-    animate_punch_pop()
-    animate_punch_shake()
+    play_sound(SFX_PUNCHLINE)
+    clock.play("punch_pop", animate_punch_pop())
+    clock.play("punch_shake", animate_punch_shake())
 
 
 # =====================
@@ -308,15 +327,23 @@ def show_punchline_after_thinking():
 # =====================
 def show_joke():
     global current_joke
-    if not jokes:
-        current_joke = ("No jokes available?", "Check your randomJokes.txt file!")
+    if jokes is None:
+        current_joke = ("Jokes file not found?", f"Make sure {jokes_file} exists!")
+    elif not len(jokes):
+        current_joke = ("No jokes available?", f"Check your {os.path.basename(jokes_file)} file!")
+    elif matches is not None:
+        if matches:
+            current_joke = jokes.joke(matches[match_bag.next()])
+        else:
+            current_joke = ("No jokes about that?", "Try another word or category!")
     else:
-        current_joke = random.choice(jokes)
+        current_joke = jokes.joke(joke_bag.next())
 
+    stop_punch_animations()
     canvas.itemconfig(setup_text_id, text=current_joke[0])
     canvas.itemconfig(punchline_text_id, text="")
     canvas.itemconfig(status_text_id, text="")
-    play_sound(sfx_new_joke)
+    play_sound(SFX_NEW_JOKE)
 
 
 def show_punchline():
@@ -325,9 +352,34 @@ def show_punchline():
     if current_joke == ("", ""):
         show_joke()
 
+    stop_punch_animations()
     canvas.itemconfig(punchline_text_id, text="")
     canvas.itemconfig(status_text_id, text="Alexa is thinking...")
-    root.after(700, show_punchline_after_thinking)
+    clock.later("thinking", THINKING_MS, show_punchline_after_thinking)
+
+
+def apply_filter(*_):
+    global matches, match_bag
+    query = search_var.get().strip()
+    category = category_var.get()
+    if category == ANY_CATEGORY:
+        category = None
+    if search_index is None or (not query and not category):
+        matches = match_bag = None
+        canvas.itemconfig(filter_text_id, text="")
+        return
+    matches = search_index.search(query, category)
+    match_bag = ShuffleBag(len(matches)) if matches else None
+    if too_common(query):
+        text = f"\"{query}\" is too common to search for, try another word"
+    else:
+        text = f"{len(matches):,} matching jokes ({search_index.last_ms:.1f} ms)"
+    canvas.itemconfig(filter_text_id, text=text)
+
+
+def joke_about(event=None):
+    apply_filter()
+    show_joke()
 
 
 def quit_app():
@@ -400,6 +452,43 @@ make_comic_button("Alexa tell me a Joke", show_joke,      btn_x_left,   buttons_
 make_comic_button("Show Punchline",       show_punchline, btn_x_center, buttons_y)
 make_comic_button("Next Joke",            show_joke,      btn_x_right,  buttons_y)
 
+
+# =====================
+#  SEARCH BAR ("a joke about ...")
+# =====================
+search_y = buttons_y + 80
+search_var = tk.StringVar()
+category_var = tk.StringVar(value=ANY_CATEGORY)
+
+canvas.create_text(
+    btn_x_left, search_y,
+    text="Tell me a joke about:",
+    font=FONT_SUB,
+    fill="white",
+    anchor="e"
+)
+
+search_entry = tk.Entry(root, textvariable=search_var, font=FONT_SUB, width=24,
+                        relief="flat", bd=4)
+search_entry.bind("<Return>", joke_about)
+canvas.create_window(btn_x_left + 12, search_y, window=search_entry, anchor="w")
+
+categories = [ANY_CATEGORY] + (search_index.categories() if search_index else [])
+category_menu = tk.OptionMenu(root, category_var, *categories, command=joke_about)
+category_menu.config(font=FONT_SUB, bg="#7DD3FC", activebackground="#BAE6FD",
+                     relief="flat", bd=0, highlightthickness=0)
+canvas.create_window(btn_x_center, search_y, window=category_menu)
+
+filter_text_id = canvas.create_text(
+    btn_x_right, search_y,
+    text="",
+    font=FONT_SUB,
+    fill="white"
+)
+if search_index is None:
+    search_entry.config(state="disabled")
+    category_menu.config(state="disabled")
+
 # Quit button (bottom right corner)
 quit_btn = tk.Button(
     root,
@@ -416,4 +505,7 @@ quit_btn = tk.Button(
 )
 canvas.create_window(screen_w - 90, screen_h - 50, window=quit_btn)
 
+# FPS / jitter readout, only when run with FRAME_PROFILE=1
+PROFILER.overlay(canvas, 24, 24)
+
 root.mainloop()
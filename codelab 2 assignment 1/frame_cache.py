@@ -0,0 +1,161 @@
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+
+from PIL import Image
+
+# =====================
+#  ON-DISK FRAME CACHE
+# =====================
+# Scaled background frames, saved as raw RGBA so the next launch can just
+# memory-map them instead of decoding + resizing the GIF again.
+#
+# One file per (GIF contents, width x height, resample filter):
+#   header    MAGIC, width, height, frame count
+#   flags     one byte per frame, 1 once that frame's pixels are written,
+#             then one more, 1 once the timeline below is written
+#   timeline  uint32 duration (ms) of every frame, then uint32 "same picture
+#             as frame n" of every frame (gif_frames.py merges repeats with it)
+#   pixels    frame 0, frame 1, ... each width * height * 4 bytes
+# Flags are only set after the data, so a half-written cache (app closed
+# mid-way) just fills in whatever is missing next time.
+#
+# The folder is kept under a size budget, oldest-used entries go first.
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Resources", "framecache")
+CACHE_MB = int(os.environ.get("ALEXA_FRAME_CACHE_MB", "1024"))   # 0 turns it off
+MAGIC = b"GFC2"
+HEADER = struct.Struct("<4sIII")
+SUFFIX = ".frames"
+
+
+def _layout(size, count):
+    # -> (where the timeline starts, where the pixels start, total file size)
+    tables = HEADER.size + count + 1
+    tables += -tables % 8
+    data = tables + count * 8
+    return tables, data, data + count * size[0] * size[1] * 4
+
+
+def file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class CachedFrames:
+    """One memory-mapped cache file."""
+
+    def __init__(self, path, size, count):
+        self.path = path
+        self.size = size
+        self.count = count
+        self.frame_bytes = size[0] * size[1] * 4
+        self.meta_flag = HEADER.size + count
+        self.tables_at, self.data_at, _ = _layout(size, count)
+        self._file = open(path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+    def has(self, index):
+        return self._mm[HEADER.size + index] == 1
+
+    def timeline(self):
+        """(durations, same_as) arrays, or None if they haven't been saved yet."""
+        if self._mm[self.meta_flag] != 1:
+            return None
+        mid = self.tables_at + self.count * 4
+        return (array("I", self._mm[self.tables_at:mid]),
+                array("I", self._mm[mid:self.data_at]))
+
+    def write_timeline(self, durations, same_as):
+        self._mm[self.tables_at:self.data_at] = durations.tobytes() + same_as.tobytes()
+        self._mm[self.meta_flag] = 1
+
+    def read(self, index):
+        at = self.data_at + index * self.frame_bytes
+        return Image.frombytes("RGBA", self.size, self._mm[at:at + self.frame_bytes])
+
+    def write(self, index, image):
+        # different frames never overlap, so worker threads can write at once
+        at = self.data_at + index * self.frame_bytes
+        self._mm[at:at + self.frame_bytes] = image.tobytes()
+        self._mm[HEADER.size + index] = 1
+
+    def close(self):
+        try:
+            self._mm.flush()
+            self._mm.close()
+        except (ValueError, OSError):
+            pass
+        self._file.close()
+
+
+class FrameCache:
+    def __init__(self, folder=CACHE_DIR, budget_mb=CACHE_MB):
+        self.folder = folder
+        self.budget = budget_mb * 1024 * 1024
+
+    def key(self, gif_path, size, resample):
+        return f"{file_hash(gif_path)}-{size[0]}x{size[1]}-{int(resample)}"
+
+    def open(self, key, size):
+        """Existing cache for `key`, or None. Counts as a use for eviction."""
+        if not self.budget:
+            return None
+        path = os.path.join(self.folder, key + SUFFIX)
+        try:
+            with open(path, "rb") as f:
+                magic, w, h, count = HEADER.unpack(f.read(HEADER.size))
+            expected = _layout((w, h), count)[2]
+            if magic != MAGIC or (w, h) != tuple(size) or os.path.getsize(path) != expected:
+                raise ValueError("stale cache file")
+            os.utime(path)
+            return CachedFrames(path, size, count)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, struct.error):
+            self._remove(path)
+            return None
+
+    def create(self, key, size, count):
+        """Empty (all frames missing) cache file, or None if it can't fit."""
+        need = _layout(size, count)[2]
+        if not self.budget or need > self.budget:
+            return None
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            self._make_room(need)
+            path = os.path.join(self.folder, key + SUFFIX)
+            with open(path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, size[0], size[1], count))
+                f.truncate(need)   # sparse, and every flag starts at 0
+            return CachedFrames(path, size, count)
+        except OSError:
+            return None   # read-only folder, full disk... just run uncached
+
+    def _make_room(self, need):
+        entries = []
+        for name in os.listdir(self.folder):
+            if name.endswith(SUFFIX):
+                p = os.path.join(self.folder, name)
+                st = os.stat(p)
+                entries.append((st.st_mtime, st.st_size, p))
+        total = sum(e[1] for e in entries)
+        for _, nbytes, p in sorted(entries):
+            if total + need <= self.budget:
+                break
+            self._remove(p)
+            total -= nbytes
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+FRAME_CACHE = FrameCache()
@@ -0,0 +1,99 @@
+import math
+import sys
+import time
+import traceback
+from tkinter import TclError
+
+# =====================
+#  FRAME CLOCK
+# =====================
+# One root.after loop drives every animation instead of each one running its
+# own chain of timers. A tween is a generator: each next() draws one step and
+# yields how many ms until it wants the next one (None = next frame).
+# Tweens are keyed, usually by what they animate, so starting one on a key
+# that's already running closes the old one first - its `finally:` gets to
+# put the item back - and two shakes can never fight over the same text again.
+#
+# The clock ticks on a FRAME_MS grid so tweens that are due together run in
+# the same tick, and it only books the tick something is actually due on: no
+# tweens, no timer at all.
+FRAME_MS = 20   # 50 fps grid, the 40 / 80 ms steps in alexa.py land on it exactly
+EARLY_MS = 1    # a tween due within this of "now" still runs this tick
+
+
+class FrameClock:
+    def __init__(self, root, frame_ms=FRAME_MS):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.tweens = {}       # key -> [due (perf_counter s), generator]
+        self._job = None
+        self._job_at = None
+
+    def play(self, key, tween, delay_ms=0):
+        """Run generator `tween` under `key`, replacing whatever was there."""
+        self.cancel(key)
+        self.tweens[key] = [time.perf_counter() + delay_ms / 1000, tween]
+        self._schedule()
+
+    def later(self, key, ms, func, *args):
+        # one-shot delayed call that can still be replaced / cancelled by key
+        def once():
+            func(*args)
+            return
+            yield
+        self.play(key, once(), ms)
+
+    def cancel(self, key):
+        entry = self.tweens.pop(key, None)
+        if entry is not None:
+            try:
+                entry[1].close()
+            except TclError:
+                pass  # widget already gone
+        if not self.tweens and self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def active(self, key):
+        return key in self.tweens
+
+    def _schedule(self):
+        if not self.tweens:
+            return
+        now = time.perf_counter()
+        due = min(entry[0] for entry in self.tweens.values())
+        frames = math.ceil(max(0.0, (due - now) * 1000 - EARLY_MS) / self.frame_ms)
+        at = now + frames * self.frame_ms / 1000
+        if self._job is not None:
+            if self._job_at <= at:
+                return   # the tick already booked comes first
+            self.root.after_cancel(self._job)
+        self._job = self.root.after(frames * self.frame_ms, self._tick)
+        self._job_at = at
+
+    def _drop(self, key, entry):
+        if self.tweens.get(key) is entry:
+            del self.tweens[key]
+
+    def _tick(self):
+        self._job = None
+        now = time.perf_counter()
+        limit = now + EARLY_MS / 1000
+        for key, entry in list(self.tweens.items()):
+            if entry[0] > limit or self.tweens.get(key) is not entry:
+                continue  # not due yet, or replaced by an earlier tween this tick
+            try:
+                wait = next(entry[1])
+            except (StopIteration, TclError):
+                self._drop(key, entry)
+                continue
+            except Exception:
+                # a broken tween only stops itself, never the whole clock
+                print(f"Animation {key!r} failed:", file=sys.stderr)
+                traceback.print_exc()
+                self._drop(key, entry)
+                continue
+            # step from the old due time so a late tick doesn't slow the
+            # tween down, but never book anything in the past
+            entry[0] = max(entry[0] + (wait or self.frame_ms) / 1000, now)
+        self._schedule()
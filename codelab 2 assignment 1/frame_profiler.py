@@ -0,0 +1,152 @@
+import atexit
+import os
+import time
+from tkinter import TclError
+
+# =====================
+#  FRAME PROFILER (opt-in)
+# =====================
+# Wrap the body of any `after`-driven animation step in
+#     with PROFILER.frame("name", target_ms):
+# and it records the real gap between ticks, how long the step took and how
+# many ticks came in late. Off unless FRAME_PROFILE=1 is set, then an FPS /
+# jitter overlay can be put on a canvas and histograms get dumped on exit
+# (to FRAME_PROFILE_OUT, default frame_profile.txt).
+MISS_FACTOR = 1.5     # a tick later than target * this counts as missed
+NEW_RUN_FACTOR = 5    # a gap bigger than target * this is a new run, not a frame
+BUCKET_MS = 2         # histogram resolution
+OVERLAY_MS = 500      # overlay refresh rate
+
+
+class _NullFrame:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullFrame()
+
+
+class Track:
+    def __init__(self, name, target_ms):
+        self.name = name
+        self.target_ms = target_ms
+        self.intervals = {}   # bucket -> count
+        self.durations = {}
+        self.frames = 0
+        self.missed = 0
+        self.sum_iv = 0.0
+        self.sum_iv_sq = 0.0
+        self.n_iv = 0
+        self.last_start = None
+        self.window = []      # recent intervals for the overlay
+        self._t = None
+
+    def __enter__(self):
+        now = time.perf_counter()
+        if self.last_start is not None:
+            iv = (now - self.last_start) * 1000
+            if iv < self.target_ms * NEW_RUN_FACTOR:
+                self._add_interval(iv)
+        self.last_start = now
+        self._t = now
+        return self
+
+    def __exit__(self, *exc):
+        took = (time.perf_counter() - self._t) * 1000
+        self.frames += 1
+        b = int(took // BUCKET_MS)
+        self.durations[b] = self.durations.get(b, 0) + 1
+        return False
+
+    def _add_interval(self, iv):
+        b = int(iv // BUCKET_MS)
+        self.intervals[b] = self.intervals.get(b, 0) + 1
+        self.n_iv += 1
+        self.sum_iv += iv
+        self.sum_iv_sq += iv * iv
+        if iv > self.target_ms * MISS_FACTOR:
+            self.missed += 1
+        self.window.append(iv)
+        if len(self.window) > 60:
+            del self.window[0]
+
+    def live(self):
+        # (fps, jitter ms) over the recent window
+        if len(self.window) < 2:
+            return 0.0, 0.0
+        mean = sum(self.window) / len(self.window)
+        jitter = (sum((v - mean) ** 2 for v in self.window) / len(self.window)) ** 0.5
+        return 1000 / mean, jitter
+
+    def report(self):
+        lines = [f"[{self.name}] target {self.target_ms} ms, {self.frames} frames, "
+                 f"{self.missed} missed deadlines"]
+        if self.n_iv:
+            mean = self.sum_iv / self.n_iv
+            sd = max(self.sum_iv_sq / self.n_iv - mean * mean, 0) ** 0.5
+            lines.append(f"  interval mean {mean:.1f} ms, jitter (sd) {sd:.1f} ms, "
+                         f"{1000 / mean:.1f} fps")
+        for title, hist in (("interval", self.intervals), ("callback", self.durations)):
+            total = sum(hist.values())
+            if not total:
+                continue
+            lines.append(f"  {title} histogram (ms):")
+            for b in sorted(hist):
+                n = hist[b]
+                bar = "#" * max(1, round(40 * n / total))
+                lines.append(f"    {b * BUCKET_MS:4d}-{(b + 1) * BUCKET_MS:<4d} {n:7d} {bar}")
+        return "\n".join(lines)
+
+
+class FrameProfiler:
+    def __init__(self, enabled=False, out_path="frame_profile.txt"):
+        self.enabled = enabled
+        self.out_path = out_path
+        self.tracks = {}
+        if enabled:
+            atexit.register(self.dump)
+
+    def frame(self, name, target_ms):
+        if not self.enabled:
+            return _NULL
+        track = self.tracks.get(name)
+        if track is None:
+            track = self.tracks[name] = Track(name, target_ms)
+        return track
+
+    def overlay(self, canvas, x=10, y=10):
+        # small FPS / jitter readout in a canvas corner, refreshed twice a second
+        if not self.enabled:
+            return
+        item = canvas.create_text(x, y, text="", anchor="nw", fill="#d00000",
+                                  font=("Consolas", 11, "bold"))
+
+        def refresh():
+            try:
+                lines = []
+                for t in self.tracks.values():
+                    fps, jitter = t.live()
+                    lines.append(f"{t.name}: {fps:5.1f} fps  ±{jitter:4.1f} ms  "
+                                 f"missed {t.missed}")
+                canvas.itemconfig(item, text="\n".join(lines))
+                canvas.tag_raise(item)
+                canvas.after(OVERLAY_MS, refresh)
+            except TclError:
+                pass  # canvas went away
+
+        refresh()
+
+    def dump(self, path=None):
+        if not self.tracks:
+            return
+        with open(path or self.out_path, "w", encoding="utf-8") as f:
+            f.write("\n\n".join(t.report() for t in self.tracks.values()) + "\n")
+
+
+PROFILER = FrameProfiler(
+    enabled=os.environ.get("FRAME_PROFILE") == "1",
+    out_path=os.environ.get("FRAME_PROFILE_OUT", "frame_profile.txt"),
+)
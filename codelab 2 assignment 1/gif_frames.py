@@ -0,0 +1,288 @@
+import hashlib
+import os
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageTk
+
+from frame_cache import FRAME_CACHE
+
+# =====================
+#  LAZY GIF FRAME SOURCE
+# =====================
+# Decodes + scales GIF frames only when they're asked for, and keeps a small
+# cache of ready PhotoImages. The cache is sized from a memory budget, so a long
+# GIF at 1920x1080 (~8 MB a frame) can't eat gigabytes any more. Frames still
+# being scaled count against it as well. When it's full
+# the frame that won't be needed for the longest (furthest behind the
+# playhead) goes first - for a looping animation that's the LRU one.
+#
+# Scaling runs on a thread pool (Pillow drops the GIL while resampling), a few
+# frames ahead of the playhead. Only turning a finished image into a
+# PhotoImage has to happen on the Tk thread, that's what pump() is for. It
+# only runs while something is actually being scaled, an idle source costs no
+# timers at all.
+#
+# Every scaled frame is also written to the on-disk FRAME_CACHE, so a warm
+# start just reads raw pixels back and never even opens the GIF.
+#
+# Playback follows a timeline of [frame, ms] built by one pass over the GIF:
+# each frame's own duration, with frames that look the same merged. Pillow's
+# seek() composites every frame (disposal method included), so "the same"
+# means what actually ends up on screen. Back-to-back repeats become one
+# longer entry, a repeat further on just reuses the first copy's image. The
+# pass runs on a background thread once and is saved in the frame cache;
+# until it's done, frames play one by one at their own duration.
+BG_MEMORY_MB = int(os.environ.get("ALEXA_BG_BUDGET_MB", "128"))
+MIN_FRAMES = 2   # current + next, never evict the one on screen
+PUMP_MS = 15     # how often finished frames get handed to Tk
+RESAMPLE = getattr(Image, "Resampling", Image).BICUBIC
+DEFAULT_FRAME_MS = 100   # browsers play a 0-10 ms (or missing) duration at this
+NOT_READY_MS = 20        # next frame still scaling -> look again this soon
+
+
+def frame_ms(duration):
+    return duration if duration and duration > 10 else DEFAULT_FRAME_MS
+
+
+class GifFrameSource:
+    def __init__(self, path, size, budget_mb=BG_MEMORY_MB, workers=None, cache=FRAME_CACHE):
+        self.path = path
+        self.size = size
+        self.gif = None
+        self.store = None
+        if cache is not None:
+            key = cache.key(path, size, RESAMPLE)
+            self.store = cache.open(key, size)
+        if self.store is not None:
+            self.count = self.store.count
+        else:
+            self._open_gif()
+            self.count = getattr(self.gif, "n_frames", 1)
+            if cache is not None:
+                self.store = cache.create(key, size, self.count)
+        frame_bytes = size[0] * size[1] * 4   # RGBA
+        self.capacity = max(MIN_FRAMES, budget_mb * 1024 * 1024 // frame_bytes)
+        self.ahead = min(self.capacity - 1, self.count - 1)
+        self.ready = {}              # frame -> PhotoImage
+        self.playhead = 0            # frame on screen
+        self.pending = {}            # frame -> Future of a scaled PIL image
+        self.durations = {}          # frame -> ms, filled in as frames get decoded
+        self.pos = 0                 # timeline entry on screen
+        self.shown = None
+        self.same_as = None          # frame -> first frame with the same picture
+        self.bad = set()             # frames that failed to decode (corrupt GIF)
+        saved = self.store.timeline() if self.store is not None else None
+        if saved is not None:
+            self._set_timeline(*saved)
+        else:
+            self.timeline = [[i, None] for i in range(self.count)]
+        self._gif_lock = threading.Lock()   # one seek/convert at a time
+        self._pool = ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 1),
+                                        thread_name_prefix="gif-scale")
+        self._scan_result = None
+        self._root = None
+        self._job = None
+        self._paused = False
+
+    def __len__(self):
+        return len(self.timeline)
+
+    def decode(self, index):
+        """Frame `index` as a scaled RGBA PIL image (no Tk involved)."""
+        if self.store is not None and self.store.has(index):
+            return self.store.read(index)
+        with self._gif_lock:
+            self._open_gif()
+            # going forwards is cheap, PIL only rewinds for a backwards seek
+            self.gif.seek(index)
+            self.durations[index] = frame_ms(self.gif.info.get("duration"))
+            frame = self.gif.convert("RGBA")
+        frame = frame.resize(self.size, RESAMPLE)
+        if self.store is not None:
+            self.store.write(index, frame)
+        return frame
+
+    def _open_gif(self):
+        if self.gif is None:
+            self.gif = Image.open(self.path)
+
+    # ---------- timeline ----------
+    def _scan(self):
+        # own file handle, so it doesn't hold up decode() on the shared one
+        durations, same_as, seen = array("I"), array("I"), {}
+        try:
+            with Image.open(self.path) as gif:
+                for i in range(self.count):
+                    gif.seek(i)
+                    durations.append(gif.info.get("duration") or 0)
+                    digest = hashlib.blake2b(gif.convert("RGBA").tobytes(), digest_size=16).digest()
+                    same_as.append(seen.setdefault(digest, i))
+        except Exception:
+            return   # damaged further on, just keep playing frame by frame
+        self._scan_result = durations, same_as
+
+    def _set_timeline(self, durations, same_as):
+        timeline = []
+        entry_of = []                # raw frame -> timeline entry
+        for i in range(self.count):
+            frame, ms = same_as[i], frame_ms(durations[i])
+            if timeline and timeline[-1][0] == frame:
+                timeline[-1][1] += ms
+            else:
+                timeline.append([frame, ms])
+            entry_of.append(len(timeline) - 1)
+        if len(timeline) > 1 and timeline[0][0] == timeline[-1][0]:
+            # the loop ends on the picture it starts with
+            timeline[0][1] += timeline.pop()[1]
+            entry_of = [e % len(timeline) for e in entry_of]
+        self.timeline = timeline
+        self._entry_of = entry_of
+        self.same_as = same_as
+
+    def _apply_scan(self):
+        durations, same_as = self._scan_result
+        self._scan_result = None
+        if self.store is not None:
+            self.store.write_timeline(durations, same_as)
+        current = self.timeline[self.pos][0]   # still a raw frame number here
+        self._set_timeline(durations, same_as)
+        self.pos = self._entry_of[current]
+        for frame in list(self.ready):
+            if same_as[frame] != frame:
+                # a repeat: its picture lives under the first copy from now on
+                self.ready.setdefault(same_as[frame], self.ready.pop(frame))
+        self.playhead = same_as[self.playhead]
+
+    def duration(self, pos):
+        frame, ms = self.timeline[pos]
+        return ms if ms is not None else self.durations.get(frame, DEFAULT_FRAME_MS)
+
+    # ---------- playback ----------
+    def first_frame(self):
+        self.shown = self.get(self.timeline[0][0])
+        return self.shown
+
+    def next_frame(self):
+        """(PhotoImage, or None if the picture doesn't change; ms until the next call)"""
+        if self._scan_result is not None:
+            self._apply_scan()
+        nxt = (self.pos + 1) % len(self.timeline)
+        if self.timeline[nxt][0] in self.bad:
+            self.pos = nxt   # can't be shown, keep the last good one up instead
+            return None, self.duration(nxt)
+        photo = self.get(self.timeline[nxt][0])
+        if photo is None:
+            return None, NOT_READY_MS   # still being scaled, hold this one a bit
+        self.pos = nxt
+        changed = photo is not self.shown
+        self.shown = photo
+        return (photo if changed else None), self.duration(nxt)
+
+    def get(self, index):
+        """PhotoImage for frame `index`, or None if it's still being scaled."""
+        self._prefetch()
+        photo = self.ready.get(index)
+        if photo is not None:
+            self.playhead = index   # the caller puts it on screen now
+            return photo
+        fut = self.pending.get(index)
+        if fut is None:
+            if self._root is not None:
+                # background mode: never block the Tk thread, ask and move on
+                self._submit(index)
+                return None
+            photo = ImageTk.PhotoImage(self.decode(index))
+        elif fut.done():
+            del self.pending[index]
+            try:
+                photo = ImageTk.PhotoImage(fut.result())
+            except Exception:
+                self.bad.add(index)
+                return None
+        else:
+            return None
+        self.playhead = index
+        self._keep(index, photo)
+        return photo
+
+    def start(self, root):
+        # switch on worker-pool scaling, results get pumped into Tk as they land
+        self._root = root
+        if self.same_as is None:
+            threading.Thread(target=self._scan, name="gif-scan", daemon=True).start()
+        self._prefetch()
+
+    def pause(self):
+        # window hidden: stop pumping (frames already made stay cached)
+        self._paused = True
+        if self._job is not None:
+            self._root.after_cancel(self._job)
+            self._job = None
+
+    def resume(self):
+        self._paused = False
+        self._arm()
+
+    def _submit(self, index):
+        if index in self.ready or index in self.pending or index in self.bad:
+            return
+        # a scaled image waiting in a future takes as much memory as a ready
+        # frame, so make room for it first (or don't start it yet)
+        while len(self.ready) + len(self.pending) >= self.capacity:
+            if not self._evict():
+                return
+        self.pending[index] = self._pool.submit(self.decode, index)
+        self._arm()
+
+    def _arm(self):
+        if self._job is None and self._root is not None and self.pending and not self._paused:
+            self._job = self._root.after(PUMP_MS, self._pump)
+
+    def _prefetch(self):
+        # the next few timeline entries, a merged repeat doesn't cost anything
+        if self._root is None:
+            return
+        n = len(self.timeline)
+        for k in range(1, min(self.ahead, n - 1) + 1):
+            self._submit(self.timeline[(self.pos + k) % n][0])
+
+    def _pump(self):
+        self._job = None
+        if self._scan_result is not None:
+            self._apply_scan()
+        for index, fut in list(self.pending.items()):
+            if fut.done():
+                del self.pending[index]
+                if self.same_as is not None and self.same_as[index] != index:
+                    continue   # asked for before the scan merged it away
+                try:
+                    self._keep(index, ImageTk.PhotoImage(fut.result()))
+                except Exception:
+                    self.bad.add(index)   # next_frame() skips over it
+        self._arm()   # only while there's still something in flight
+
+    def _keep(self, index, photo):
+        self.ready[index] = photo
+        while len(self.ready) + len(self.pending) > self.capacity and self._evict():
+            pass
+
+    def _evict(self):
+        # playhead = the frame on screen, distance 0, so never picked
+        stale = max(self.ready, key=lambda i: (i - self.playhead) % self.count, default=None)
+        if stale is None or stale == self.playhead:
+            return False
+        del self.ready[stale]
+        return True
+
+    def close(self):
+        if self._job is not None:
+            self._root.after_cancel(self._job)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.ready.clear()
+        self.pending.clear()
+        if self.store is not None:
+            self.store.close()
+        if self.gif is not None:
+            self.gif.close()
@@ -0,0 +1,265 @@
+import hashlib
+import json
+import mmap
+import os
+import random
+import re
+import struct
+from array import array
+
+# =====================
+#  JOKE CORPUS
+# =====================
+# Random access into a jokes file of any size without loading it.
+# Format is the same as always, one "setup?punchline" per line.
+#
+# The first time a file is opened we scan it once and save the byte offset of
+# every joke line, and where its "?" is, in "<file>.idx" next to it
+# (joke_ingest.py writes that file itself). After that, both files are just
+# memory-mapped, so opening a multi-million line corpus costs the same as
+# opening a 36-line one. A joke is only decoded and split at "?" when it's
+# actually picked.
+#
+# A line can end with category tags, "Why ...?Because ... #animals #puns".
+# They're for joke_search.py and never shown.
+RES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Resources")
+MERGED_JOKES = os.path.join(RES_DIR, "mergedJokes.txt")     # from joke_ingest.py
+RANDOM_JOKES = os.path.join(RES_DIR, "randomJokes.txt")
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"JIX2"
+INDEX_HEADER = struct.Struct("<4sQQQ")   # magic, source size, source mtime_ns, jokes
+FEISTEL_ROUNDS = 4
+MASK64 = (1 << 64) - 1
+TAGS_RE = re.compile(r"(?:\s+#[\w-]+)+\s*$")
+
+
+def split_tags(line):
+    """("text without tags", ["animals", ...])"""
+    m = TAGS_RE.search(line)
+    if not m:
+        return line, []
+    return line[:m.start()], [t[1:].lower() for t in m.group().split()]
+
+
+def corpus_path():
+    """Jokes file to use: $ALEXA_JOKES if set, otherwise the merged corpus from
+    joke_ingest.py as long as it's newer than randomJokes.txt, else randomJokes.txt."""
+    chosen = os.environ.get("ALEXA_JOKES")
+    if chosen:
+        return chosen
+    try:
+        merged = os.stat(MERGED_JOKES).st_mtime_ns
+    except OSError:
+        return RANDOM_JOKES
+    try:
+        if os.stat(RANDOM_JOKES).st_mtime_ns > merged:
+            return RANDOM_JOKES   # edited since the last ingest, the merge is stale
+    except OSError:
+        pass
+    return MERGED_JOKES
+
+
+def build_offsets(mm):
+    # start offset of every line that has a "?" in it, and how far in the "?" is
+    offsets = array("Q")
+    splits = array("I")
+    size = len(mm)
+    pos = 0
+    while pos < size:
+        end = mm.find(b"\n", pos)
+        if end < 0:
+            end = size
+        q = mm.find(b"?", pos, end)
+        if q >= 0:
+            offsets.append(pos)
+            splits.append(q - pos)
+        pos = end + 1
+    return offsets, splits
+
+
+def write_index(path, offsets, splits):
+    """Save the .idx for jokes file `path` (stamped with its current size / mtime)."""
+    st = os.stat(path)
+    idx_path = path + INDEX_SUFFIX
+    tmp = idx_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, st.st_size, st.st_mtime_ns, len(offsets)))
+        offsets.tofile(f)
+        splits.tofile(f)
+    os.replace(tmp, idx_path)
+
+
+class JokeCorpus:
+    def __init__(self, path):
+        self.path = path
+        st = os.stat(path)   # FileNotFoundError goes to the caller
+        self.stamp = (st.st_size, st.st_mtime_ns)
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else b""
+        self._idx_file = None
+        self._idx_mm = None
+        self.offsets, self.splits = self._load_index(st)
+
+    def _load_index(self, st):
+        idx_path = self.path + INDEX_SUFFIX
+        try:
+            f = open(idx_path, "rb")
+        except OSError:
+            pass
+        else:
+            head = f.read(INDEX_HEADER.size)
+            body = os.fstat(f.fileno()).st_size - INDEX_HEADER.size
+            if len(head) == INDEX_HEADER.size:
+                magic, size, mtime_ns, count = INDEX_HEADER.unpack(head)
+                if (magic, size, mtime_ns) == (INDEX_MAGIC, st.st_size, st.st_mtime_ns) \
+                        and body == count * 12:
+                    if not count:
+                        f.close()
+                        return array("Q"), array("I")
+                    self._idx_file = f
+                    self._idx_mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    view = memoryview(self._idx_mm)
+                    at = INDEX_HEADER.size + count * 8
+                    return view[INDEX_HEADER.size:at].cast("Q"), view[at:].cast("I")
+            f.close()   # stale, the jokes file changed since
+
+        offsets, splits = build_offsets(self._mm)
+        try:
+            write_index(self.path, offsets, splits)
+        except OSError:
+            pass   # read-only folder, just keep the index in memory this run
+        return offsets, splits
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def line(self, i):
+        start = self.offsets[i]
+        end = self._mm.find(b"\n", start)
+        if end < 0:
+            end = len(self._mm)
+        return self._mm[start:end].decode("utf-8", errors="replace").strip()
+
+    def end_of(self, i):
+        """Byte offset just past joke line i (and its newline)."""
+        end = self._mm.find(b"\n", self.offsets[i])
+        return len(self._mm) if end < 0 else end + 1
+
+    def raw(self, start, end):
+        return self._mm[start:end]
+
+    def prefix_hash(self, nbytes):
+        # lets an index built on the first nbytes check it's still the same text
+        return hashlib.sha1(self._mm[:nbytes]).hexdigest()
+
+    def joke(self, i):
+        """(setup, punchline) for joke number i."""
+        start = self.offsets[i]
+        q = start + self.splits[i]
+        end = self._mm.find(b"\n", q)
+        if end < 0:
+            end = len(self._mm)
+        setup = self._mm[start:q].decode("utf-8", errors="replace").strip()
+        punchline = split_tags(self._mm[q + 1:end].decode("utf-8", errors="replace"))[0]
+        return setup + "?", punchline.strip()
+
+    def random_joke(self, rng=random):
+        return self.joke(rng.randrange(len(self.offsets)))
+
+    def close(self):
+        if isinstance(self.offsets, memoryview):
+            self.offsets.release()
+            self.splits.release()
+        if self._idx_mm is not None:
+            self._idx_mm.close()
+            self._idx_file.close()
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+
+# =====================
+#  SHUFFLE BAG
+# =====================
+# Deals out every joke exactly once per cycle, in a fresh random order each
+# cycle, without ever building a shuffled list. Position p of cycle c is a
+# small Feistel network keyed on (seed, c) applied to p: that's a bijection
+# on 0 .. 2^bits - 1, and "cycle walking" (re-encrypting anything >= size)
+# shrinks it to a bijection on 0 .. size - 1. So the whole state is four
+# numbers, which get saved to disk after every draw.
+def _mix64(x):
+    # splitmix64 finaliser, a cheap well-spread hash
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & MASK64
+    return x ^ (x >> 31)
+
+
+class ShuffleBag:
+    def __init__(self, size, state_path=None, rng=random):
+        self.size = size
+        self.state_path = state_path
+        self.seed = rng.getrandbits(64)
+        self.cycle = 0
+        self.pos = 0
+        bits = max(2, (size - 1).bit_length())
+        self.half = (bits + 1) // 2          # balanced halves, domain < 4 * size
+        self.mask = (1 << self.half) - 1
+        self._load()
+
+    def _load(self):
+        if not self.state_path:
+            return
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state["size"] == self.size:   # corpus changed -> start a new bag
+                self.seed, self.cycle, self.pos = state["seed"], state["cycle"], state["pos"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _save(self):
+        if not self.state_path:
+            return
+        state = {"size": self.size, "seed": self.seed, "cycle": self.cycle, "pos": self.pos}
+        tmp = self.state_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp, self.state_path)
+        except OSError:
+            pass   # can't save, the order just won't survive a restart
+
+    def _encrypt(self, key, x):
+        left, right = x >> self.half, x & self.mask
+        for r in range(FEISTEL_ROUNDS):
+            left, right = right, left ^ (_mix64(key ^ (r << 56) ^ right) & self.mask)
+        return (left << self.half) | right
+
+    def _permute(self, cycle, pos):
+        key = _mix64(self.seed + cycle * 0x9E3779B97F4A7C15 & MASK64)
+        x = self._encrypt(key, pos)
+        while x >= self.size:
+            x = self._encrypt(key, x)
+        return x
+
+    def index_at(self, cycle, pos):
+        """Joke index dealt at position `pos` of `cycle`."""
+        if self.size == 2:
+            return (self.seed + pos) & 1   # only non-repeating order is to alternate
+        if cycle and self.size > 2 and pos < 2:
+            # don't let a new cycle open with the joke the last one ended on,
+            # if it would, that cycle deals its first two the other way round
+            if self._permute(cycle, 0) == self._permute(cycle - 1, self.size - 1):
+                pos = 1 - pos
+        return self._permute(cycle, pos)
+
+    def next(self):
+        if self.size <= 0:
+            raise IndexError("empty shuffle bag")
+        if self.pos >= self.size:
+            self.cycle += 1
+            self.pos = 0
+        index = self.index_at(self.cycle, self.pos)
+        self.pos += 1
+        self._save()
+        return index
@@ -0,0 +1,143 @@
+import argparse
+import csv
+import hashlib
+import itertools
+import os
+import sys
+import time
+import unicodedata
+from array import array
+from collections import Counter
+
+from joke_corpus import MERGED_JOKES, RANDOM_JOKES, split_tags, write_index
+from ordered_pool import map_ordered
+
+# =====================
+#  JOKE INGESTION
+# =====================
+# Merges any number of joke files into one clean corpus for alexa.py:
+#   python joke_ingest.py Resources/randomJokes.txt more_jokes/*.txt
+#
+# Lines are streamed in chunks to a process pool, which normalises them
+# (unicode, quotes, whitespace, tags) and checks there's a real setup and
+# punchline either side of the first "?". The parent keeps input order, drops
+# duplicates by a hash of the joke's letters and digits (so case / punctuation
+# changes still count as the same joke), and writes the merged file plus its
+# .idx (offsets + "?" positions), so alexa.py never has to scan it.
+# Anything thrown out goes to a rejects CSV with the reason.
+CHUNK = 5000          # lines per worker job
+MAX_CHARS = 400       # longer than this isn't a one-liner any more
+QUOTES = str.maketrans({"\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"',
+                        "\u00ab": '"', "\u00bb": '"', "\ufeff": None})
+
+
+def clean_joke(raw):
+    """-> (line, dedup key) or raises ValueError with the reject reason."""
+    text = unicodedata.normalize("NFKC", raw).translate(QUOTES)
+    text = " ".join(text.split())
+    text, tags = split_tags(text)
+    if "?" not in text:
+        raise ValueError("no '?' between setup and punchline")
+    setup, punchline = text.split("?", 1)
+    setup, punchline = setup.strip(), punchline.lstrip("? ")   # "setup?? punch"
+    if not setup:
+        raise ValueError("empty setup")
+    if not punchline.strip("?!. "):
+        raise ValueError("empty punchline")
+    if len(setup) + len(punchline) > MAX_CHARS:
+        raise ValueError(f"longer than {MAX_CHARS} characters")
+    line = f"{setup}?{punchline}" + "".join(f" #{t}" for t in sorted(set(tags)))
+    letters = "".join(ch for ch in (setup + punchline).casefold() if ch.isalnum())
+    key = int.from_bytes(hashlib.blake2b(letters.encode("utf-8"), digest_size=8).digest(), "little")
+    return line, key
+
+
+def _clean_chunk(job):
+    source, first_no, lines = job
+    out = []
+    for n, raw in enumerate(lines, first_no):
+        if not raw.strip():
+            continue
+        try:
+            line, key = clean_joke(raw)
+        except ValueError as err:
+            out.append((source, n, None, None, str(err), raw.rstrip("\r\n")))
+        else:
+            out.append((source, n, line, key, "", ""))
+    return out
+
+
+def read_jobs(paths):
+    # (file, first line number, raw lines) chunks, lazily, file after file
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace", newline="") as f:
+            n = 1
+            while lines := list(itertools.islice(f, CHUNK)):
+                yield path, n, lines
+                n += len(lines)
+
+
+def clean_stream(paths, workers=None):
+    """Cleaned / rejected lines in input order, never holding more than a few chunks."""
+    for cleaned in map_ordered(_clean_chunk, read_jobs(paths), workers):
+        yield from cleaned
+
+
+def ingest(paths, out_path, rejects_path=None, workers=None):
+    """Write the merged corpus + index, returns (kept, Counter of reject reasons)."""
+    seen = set()
+    offsets = array("Q")
+    splits = array("I")
+    reasons = Counter()
+    tmp = out_path + ".tmp"
+    rejects = open(rejects_path, "w", encoding="utf-8", newline="") if rejects_path else None
+    try:
+        rw = csv.writer(rejects) if rejects else None
+        if rw:
+            rw.writerow(("source", "line", "reason", "text"))
+        with open(tmp, "wb") as out:
+            pos = 0
+            for source, n, line, key, reason, raw in clean_stream(paths, workers):
+                if line is not None and key in seen:
+                    reason, raw = "duplicate", line
+                if reason:
+                    reasons[reason] += 1
+                    if rw:
+                        rw.writerow((source, n, reason, raw))
+                    continue
+                seen.add(key)
+                data = line.encode("utf-8") + b"\n"
+                offsets.append(pos)
+                splits.append(data.index(b"?"))
+                out.write(data)
+                pos += len(data)
+    finally:
+        if rejects:
+            rejects.close()
+    os.replace(tmp, out_path)
+    write_index(out_path, offsets, splits)
+    return len(offsets), reasons
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Merge, clean and dedupe joke files for alexa.py.")
+    ap.add_argument("sources", nargs="*", default=[RANDOM_JOKES],
+                    help="joke files, one setup?punchline per line")
+    ap.add_argument("-o", "--out", default=MERGED_JOKES, help="merged corpus to write")
+    ap.add_argument("--rejects", help="CSV of every line that was thrown out, and why")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    args = ap.parse_args()
+
+    t = time.perf_counter()
+    kept, reasons = ingest(args.sources, args.out, args.rejects, args.workers)
+    took = time.perf_counter() - t
+    total = kept + sum(reasons.values())
+    print(f"{len(args.sources)} files, {total:,} jokes read in {took:.2f}s "
+          f"({total / took if took else 0:,.0f}/s)", file=sys.stderr)
+    print(f"kept {kept:,} -> {args.out}", file=sys.stderr)
+    for reason, n in reasons.most_common():
+        print(f"  rejected {n:,}: {reason}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import random
+import time
+
+from joke_server import HOST, PORT
+from quiz_loadtest import percentile
+
+# =====================
+#  JOKE SERVICE LOAD TEST
+# =====================
+# N keep-alive connections to joke_server.py, each firing a mix of random /
+# next / search requests back to back; every round trip gets timed.
+SEARCH_WORDS = ["chicken", "road", "doctor", "cat", "dog", "pizza", "fish", "computer"]
+
+
+def pick_request(rng):
+    r = rng.random()
+    if r < 0.5:
+        return "/joke/random"
+    if r < 0.8:
+        return "/joke/next"
+    return f"/search?q={rng.choice(SEARCH_WORDS)}&limit=10"
+
+
+async def fake_client(host, port, requests, latencies, errors, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(requests):
+            path = pick_request(rng)
+            t = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.partition(b":")
+                if name.lower() == b"content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t)
+            if status != 200:
+                errors.append(f"{status} {path}")
+    finally:
+        writer.close()
+
+
+async def run(clients, requests, host, port, ramp):
+    latencies, errors = [], []
+    rng = random.Random(0)
+    tasks = []
+    start = time.perf_counter()
+    for i in range(clients):
+        tasks.append(asyncio.create_task(
+            fake_client(host, port, requests, latencies, errors, rng)))
+        if ramp and i % 100 == 99:
+            await asyncio.sleep(ramp)
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    took = time.perf_counter() - start
+    failed = [r for r in results if isinstance(r, BaseException)]
+    return latencies, errors, took, failed
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load-test joke_server.py.")
+    ap.add_argument("--clients", type=int, default=200)
+    ap.add_argument("--requests", type=int, default=100, help="requests per client")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--ramp", type=float, default=0.01,
+                    help="pause (s) after every 100 connections opened")
+    args = ap.parse_args()
+
+    latencies, errors, took, failed = asyncio.run(run(
+        args.clients, args.requests, args.host, args.port, args.ramp))
+    lat = sorted(latencies)
+    ms = [v * 1000 for v in (percentile(lat, 50), percentile(lat, 95), percentile(lat, 99))]
+    print(f"{args.clients} clients x {args.requests} requests: {len(lat):,} done in {took:.2f}s")
+    print(f"throughput {len(lat) / took:,.0f} req/s")
+    print(f"latency p50 {ms[0]:.2f} ms, p95 {ms[1]:.2f} ms, p99 {ms[2]:.2f} ms, "
+          f"max {lat[-1] * 1000 if lat else 0:.2f} ms")
+    if errors:
+        print(f"{len(errors)} non-200 replies, e.g. {errors[0]}")
+    if failed:
+        print(f"{len(failed)} clients failed, e.g. {failed[0]!r}")
+
+
+if __name__ == "__main__":
+    main()
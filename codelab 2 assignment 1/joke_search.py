@@ -0,0 +1,282 @@
+import json
+import mmap
+import os
+import re
+import struct
+import time
+from array import array
+from bisect import bisect_left
+
+from joke_corpus import split_tags
+
+# =====================
+#  JOKE SEARCH INDEX
+# =====================
+# Inverted index over a JokeCorpus: word -> sorted joke numbers, plus
+# "#tag" -> joke numbers for the category tags at the end of a line.
+#
+# It lives in "<jokes file>.search/" as one or more segment files:
+#   header    magic, term count, then where each block below starts
+#   terms     every term, sorted, utf-8, back to back
+#   term_at   uint64 start of each term (+ one past the end)
+#   post_at   uint64 start of each term's postings (+ one past the end)
+#   postings  uint32 joke numbers, sorted
+# Segments are memory-mapped and searched with bisect, nothing gets loaded,
+# so a lookup costs the same however big the corpus is.
+#
+# manifest.json remembers how much of the jokes file was indexed (bytes, joke
+# count and a hash of those bytes). If the file has only grown, the new jokes
+# go in a new segment; any other change (or too many segments) rebuilds it.
+# If the old file ended without a newline, its last joke may have been
+# appended to, so that one goes in the new segment again as well.
+SEARCH_SUFFIX = ".search"
+SEG_MAGIC = b"JSX1"
+SEG_HEADER = struct.Struct("<4sQQQQQ")   # magic, n_terms, 4 block offsets
+MAX_SEGMENTS = 8
+BISECT_RATIO = 32   # see search()
+MIN_PREFIX = 3      # words this long also match longer words ("cat" -> "cats")
+TOKEN_RE = re.compile(r"[\w']+")
+STOP_WORDS = frozenset(
+    "a an and are as at be but by did do does for from had has have he her his "
+    "i if in is it its me my no not of on or our she so that the their them "
+    "they this to was we were what when where which who why will with you your".split()
+)
+
+
+def tokenize(text):
+    words = set()
+    for w in TOKEN_RE.findall(text.lower()):
+        w = w.replace("'", "")
+        if len(w) > 1 and w not in STOP_WORDS:
+            words.add(w)
+    return words
+
+
+def too_common(query):
+    # typed something, but every word is a stop word / too short to be indexed
+    return bool(query.strip()) and not tokenize(query)
+
+
+def joke_terms(line):
+    text, tags = split_tags(line)
+    return tokenize(text) | {"#" + t for t in tags}
+
+
+# ------------------ SEGMENTS ------------------
+def write_segment(path, postings):
+    # postings: term -> array("I") of joke numbers, already in order
+    terms = sorted(postings)
+    blob = bytearray()
+    term_at = array("Q", [0])
+    post_at = array("Q", [0])
+    for t in terms:
+        blob += t.encode("utf-8")
+        term_at.append(len(blob))
+        post_at.append(post_at[-1] + len(postings[t]))
+    blob += b"\0" * (-len(blob) % 8)   # keep the arrays after it aligned
+
+    at_terms = SEG_HEADER.size
+    at_term_at = at_terms + len(blob)
+    at_post_at = at_term_at + len(term_at) * 8
+    at_postings = at_post_at + len(post_at) * 8
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(SEG_HEADER.pack(SEG_MAGIC, len(terms), at_terms, at_term_at,
+                                at_post_at, at_postings))
+        f.write(blob)
+        term_at.tofile(f)
+        post_at.tofile(f)
+        for t in terms:
+            postings[t].tofile(f)
+    os.replace(tmp, path)
+
+
+class Segment:
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.n, at_terms, at_term_at, at_post_at, at_postings = \
+            SEG_HEADER.unpack_from(self._mm)
+        if magic != SEG_MAGIC:
+            raise ValueError(f"{path} isn't a search segment")
+        view = memoryview(self._mm)
+        self._terms_at = at_terms
+        self.term_at = view[at_term_at:at_post_at].cast("Q")
+        self.post_at = view[at_post_at:at_postings].cast("Q")
+        self.postings = view[at_postings:].cast("I")
+        self._views = (view, self.term_at, self.post_at, self.postings)
+
+    def term(self, k):
+        a = self._terms_at
+        return self._mm[a + self.term_at[k]:a + self.term_at[k + 1]].decode("utf-8")
+
+    def find(self, term):
+        # index of the first term >= `term` (bisect over the mmap)
+        lo, hi = 0, self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.term(mid) < term:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def matching(self, word, prefix):
+        # term numbers for `word`, or for every term starting with it
+        k = self.find(word)
+        if not prefix:
+            return [k] if k < self.n and self.term(k) == word else []
+        out = []
+        while k < self.n and self.term(k).startswith(word):
+            out.append(k)
+            k += 1
+        return out
+
+    def postings_of(self, k):
+        return self.postings[self.post_at[k]:self.post_at[k + 1]]
+
+    def close(self):
+        for v in reversed(self._views):
+            v.release()
+        self._mm.close()
+        self._file.close()
+
+
+# ------------------ INDEX ------------------
+class JokeSearch:
+    def __init__(self, corpus):
+        self.corpus = corpus
+        self.folder = corpus.path + SEARCH_SUFFIX
+        self.manifest_path = os.path.join(self.folder, "manifest.json")
+        self.segments = []
+        self.last_ms = 0.0
+        self._update()
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                m = json.load(f)
+            if all(os.path.exists(os.path.join(self.folder, s)) for s in m["segments"]):
+                return m
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def _update(self):
+        corpus = self.corpus
+        m = self._read_manifest()
+        start = m["indexed"] if m is not None else 0
+        if m is not None and m["stamp"] != list(corpus.stamp):
+            # file changed: fine if it only grew and the old part is identical
+            grew = (m["indexed"] <= len(corpus) and m["bytes"] <= corpus.stamp[0]
+                    and corpus.prefix_hash(m["bytes"]) == m["sha1"])
+            if grew and m["indexed"] and corpus.raw(m["bytes"] - 1, m["bytes"]) != b"\n":
+                start = self._reopened(m)
+                grew = start is not None
+            if not grew or len(m["segments"]) >= MAX_SEGMENTS:
+                m = None
+        if m is None:
+            m = {"segments": [], "indexed": 0, "bytes": 0, "sha1": "", "stamp": []}
+            start = 0
+            self._clear()
+
+        if start < len(corpus):
+            os.makedirs(self.folder, exist_ok=True)
+            name = f"seg-{len(m['segments']):03d}.jsx"
+            write_segment(os.path.join(self.folder, name), self._build(start, len(corpus)))
+            m["segments"].append(name)
+            m["indexed"] = len(corpus)
+            m["bytes"] = corpus.end_of(len(corpus) - 1)
+            m["sha1"] = corpus.prefix_hash(m["bytes"])
+        if m["stamp"] != list(corpus.stamp):
+            m["stamp"] = list(corpus.stamp)
+            self._write_manifest(m)
+        self.segments = [Segment(os.path.join(self.folder, s)) for s in m["segments"]]
+
+    def _reopened(self, m):
+        # the last indexed joke had no newline, so text may have been added to
+        # it. Indexing it again in the new segment is enough if it only gained
+        # terms (postings from all segments get merged); if it lost one (a word
+        # got longer), the old segment is wrong about it -> None = rebuild
+        last = m["indexed"] - 1
+        old = self.corpus.raw(self.corpus.offsets[last], m["bytes"])
+        old_terms = joke_terms(old.decode("utf-8", errors="replace").strip())
+        return last if old_terms <= joke_terms(self.corpus.line(last)) else None
+
+    def _build(self, start, end):
+        postings = {}
+        for i in range(start, end):
+            for t in joke_terms(self.corpus.line(i)):
+                ids = postings.get(t)
+                if ids is None:
+                    ids = postings[t] = array("I")
+                ids.append(i)
+        return postings
+
+    def _write_manifest(self, m):
+        os.makedirs(self.folder, exist_ok=True)
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(m, f)
+        os.replace(tmp, self.manifest_path)
+
+    def _clear(self):
+        if os.path.isdir(self.folder):
+            for name in os.listdir(self.folder):
+                os.remove(os.path.join(self.folder, name))
+
+    # --- queries ---
+    def _lists(self, word, prefix):
+        return [seg.postings_of(k) for seg in self.segments for k in seg.matching(word, prefix)]
+
+    def categories(self):
+        tags = set()
+        for seg in self.segments:
+            tags.update(seg.term(k)[1:] for k in seg.matching("#", True))
+        return sorted(tags)
+
+    def search(self, query="", category=None):
+        """Sorted joke numbers matching every word in `query` (and the category).
+        A query of only stop words matches nothing, see too_common()."""
+        t = time.perf_counter()
+        groups = [self._lists(w, len(w) >= MIN_PREFIX) for w in sorted(tokenize(query))]
+        if category:
+            groups.append(self._lists("#" + category.lower(), False))
+        if too_common(query):
+            result = []
+        elif not groups:
+            result = range(len(self.corpus))
+        elif not all(groups):
+            result = []
+        else:
+            # start from the rarest word; against a much bigger list it's
+            # cheaper to bisect for each hit than to build that list's set
+            groups.sort(key=_total)
+            hits = set().union(*groups[0])
+            for lists in groups[1:]:
+                if len(hits) * BISECT_RATIO < _total(lists):
+                    hits = {i for i in hits if _contains(lists, i)}
+                else:
+                    hits.intersection_update(set().union(*lists))
+                if not hits:
+                    break
+            result = sorted(hits)
+        self.last_ms = (time.perf_counter() - t) * 1000
+        return result
+
+    def close(self):
+        for seg in self.segments:
+            seg.close()
+        self.segments = []
+
+
+def _total(lists):
+    return sum(len(p) for p in lists)
+
+
+def _contains(lists, i):
+    for p in lists:
+        k = bisect_left(p, i)
+        if k < len(p) and p[k] == i:
+            return True
+    return False
@@ -0,0 +1,183 @@
+import argparse
+import asyncio
+import json
+import random
+from functools import lru_cache
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from joke_corpus import JokeCorpus, ShuffleBag, corpus_path, split_tags
+from joke_search import JokeSearch, too_common
+
+# =====================
+#  JOKE SERVICE (headless)
+# =====================
+# The same jokes alexa.py shows, over plain HTTP/JSON for other tools:
+#   GET /joke/random[?category=animals]    a random joke (no repeats till all are used)
+#   GET /joke/next[?after=41]              jokes in file order, wraps around
+#   GET /joke/41                           joke number 41
+#   GET /search?q=chicken&category=&limit=20&offset=0
+#   GET /categories
+#   GET /health
+# The corpus is the memory-mapped JokeCorpus + JokeSearch index, and encoded
+# joke bodies / search results sit in LRU caches so hot requests are just a
+# dict lookup. Keep-alive HTTP/1.1 on asyncio streams, no extra packages.
+HOST = "127.0.0.1"
+PORT = 8766
+JOKE_CACHE = 4096       # encoded jokes kept
+SEARCH_CACHE = 256      # distinct (query, category) match lists kept
+MAX_LIMIT = 100
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+class JokeService:
+    def __init__(self, corpus, search=None, rng=random):
+        self.corpus = corpus
+        self.search_index = search
+        self.rng = rng
+        self.bag = ShuffleBag(len(corpus), rng=rng) if len(corpus) else None
+        self.cursor = -1
+        # per-instance caches (an lru_cache on the method would pin `self`)
+        self.joke_body = lru_cache(maxsize=JOKE_CACHE)(self._joke_body)
+        self.matches = lru_cache(maxsize=SEARCH_CACHE)(self._matches)
+        self.response = lru_cache(maxsize=SEARCH_CACHE)(self._cached_response)
+
+    def _joke(self, i):
+        setup, punchline = self.corpus.joke(i)
+        tags = split_tags(self.corpus.line(i))[1]
+        return {"id": i, "setup": setup, "punchline": punchline, "tags": tags}
+
+    def _joke_body(self, i):
+        return json.dumps(self._joke(i)).encode()
+
+    def _matches(self, query, category):
+        if self.search_index is None:
+            return ()
+        ids = self.search_index.search(query, category or None)
+        # no query + no category = every joke, keep that a lazy range instead
+        # of caching a corpus-sized tuple
+        return ids if isinstance(ids, range) else tuple(ids)
+
+    def handle(self, path, params):
+        """-> (status, json bytes). Pure, so it's easy to poke at without sockets."""
+        parts = [p for p in path.split("/") if p]
+        n = len(self.corpus)
+        if parts[:1] == ["joke"] and len(parts) == 2:
+            if not n:
+                return 404, b'{"error": "no jokes loaded"}'
+            what = parts[1]
+            if what == "random":
+                category = params.get("category", "")
+                if category:
+                    ids = self.matches("", category)
+                    if not ids:
+                        return 404, b'{"error": "no jokes in that category"}'
+                    return 200, self.joke_body(self.rng.choice(ids))
+                return 200, self.joke_body(self.bag.next())
+            if what == "next":
+                if "after" in params:
+                    try:
+                        self.cursor = int(params["after"])
+                    except ValueError:
+                        return 400, b'{"error": "after must be a joke id"}'
+                self.cursor = (self.cursor + 1) % n
+                return 200, self.joke_body(self.cursor)
+            # isdigit() alone lets "²" through, which int() can't read
+            if what.isascii() and what.isdigit() and int(what) < n:
+                return 200, self.joke_body(int(what))
+            return 404, b'{"error": "no such joke"}'
+        if parts in (["search"], ["categories"]):
+            key = (parts[0], params.get("q", ""), params.get("category", ""),
+                   params.get("limit", "20"), params.get("offset", "0"))
+            return self.response(*key)
+        if parts == ["health"]:
+            return 200, json.dumps({"ok": True, "jokes": n}).encode()
+        return 404, b'{"error": "unknown endpoint"}'
+
+    def _cached_response(self, what, query, category, limit, offset):
+        # whole encoded reply for the deterministic endpoints
+        if what == "categories":
+            cats = self.search_index.categories() if self.search_index else []
+            return 200, json.dumps({"categories": cats}).encode()
+        try:
+            limit = max(0, min(int(limit), MAX_LIMIT))
+            offset = max(0, int(offset))
+        except ValueError:
+            return 400, b'{"error": "limit and offset must be numbers"}'
+        if too_common(query):
+            return 400, b'{"error": "every word in q is too common to search for"}'
+        ids = self.matches(query.strip(), category.strip())
+        results = b",".join(self.joke_body(i) for i in ids[offset:offset + limit])
+        head = json.dumps({"total": len(ids), "offset": offset})[:-1]
+        return 200, (head + ', "results": [').encode() + results + b"]}"
+
+
+# ------------------ HTTP ------------------
+def http_response(status, body, keep_alive=True):
+    return (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode() + body
+
+
+async def serve_client(service, reader, writer):
+    try:
+        while request_line := await reader.readline():
+            try:
+                method, target, version = request_line.decode("latin-1").split()
+            except ValueError:
+                writer.write(http_response(400, b'{"error": "bad request line"}', False))
+                break
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = headers.get("content-length", "0")
+            if length.isdigit() and int(length):
+                await reader.readexactly(int(length))   # GET has no use for a body
+            keep_alive = (version == "HTTP/1.1"
+                          and headers.get("connection", "").lower() != "close")
+
+            if method != "GET":
+                status, body = 405, b'{"error": "GET only"}'
+            else:
+                url = urlsplit(target)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                status, body = service.handle(unquote(url.path), params)
+            writer.write(http_response(status, body, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run_server(service, host=HOST, port=PORT):
+    server = await asyncio.start_server(
+        lambda r, w: serve_client(service, r, w), host, port, backlog=4096)
+    print(f"Joke service on http://{host}:{port} ({len(service.corpus):,} jokes)")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve alexa.py's jokes as HTTP/JSON.")
+    ap.add_argument("--jokes", default=corpus_path(), help="jokes file (default: alexa.py's)")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    args = ap.parse_args()
+
+    corpus = JokeCorpus(args.jokes)
+    try:
+        search = JokeSearch(corpus) if len(corpus) else None
+    except (OSError, ValueError):
+        search = None   # search endpoints just come back empty
+    try:
+        asyncio.run(run_server(JokeService(corpus, search), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
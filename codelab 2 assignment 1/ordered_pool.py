@@ -0,0 +1,30 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# =====================
+#  ORDERED PROCESS POOL
+# =====================
+# The batch tools (quiz_grader.py, joke_ingest.py) all do the same thing:
+# cut a big input into chunks, work on the chunks in other processes, and
+# write the results out in input order. Only a few chunks per worker are ever
+# queued, so memory stays flat however big the input is.
+IN_FLIGHT = 4         # jobs queued per worker
+
+
+def map_ordered(func, jobs, workers=None, in_flight=IN_FLIGHT):
+    """func(job) for every job, in order. workers=1 runs it all in this process.
+    `func` and the jobs go to other processes, so they have to pickle."""
+    if workers == 1:
+        for job in jobs:
+            yield func(job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        limit = (workers or os.cpu_count() or 1) * in_flight
+        pending = deque()
+        for job in jobs:
+            pending.append(pool.submit(func, job))
+            if len(pending) >= limit:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
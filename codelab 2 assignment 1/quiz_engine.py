@@ -0,0 +1,133 @@
+import random
+import time
+from collections import namedtuple
+
+# ------------------ QUIZ RULES ------------------
+# Same rules the Tk quiz always had, just with no widgets attached, so the
+# game can be driven (and timed) without a display.
+QUESTIONS = 10
+FIRST_TRY_POINTS = 10
+SECOND_TRY_POINTS = 5
+MAX_ATTEMPTS = 2
+MAX_SCORE = QUESTIONS * FIRST_TRY_POINTS
+
+# answer() outcomes
+CORRECT = "correct"     # right answer, question done
+RETRY = "retry"         # wrong on the first try, one more go
+WRONG = "wrong"         # wrong twice, question done
+
+
+class Question(namedtuple("Question", "a op b")):
+    @property
+    def answer(self):
+        return self.a + self.b if self.op == "+" else self.a - self.b
+
+    @property
+    def text(self):
+        return f"{self.a} {self.op} {self.b} = "
+
+
+# what happened on one question: attempts used, final outcome, seconds taken
+QuestionLog = namedtuple("QuestionLog", "question attempts outcome seconds")
+# every single submit: which try it was, right or not, seconds since shown
+Attempt = namedtuple("Attempt", "question number correct seconds")
+
+
+def rand_num(level, rng=random):
+    if level == 1:
+        return rng.randint(1, 9)
+    elif level == 2:
+        return rng.randint(10, 99)
+    else:
+        return rng.randint(1000, 9999)
+
+
+def pick_operator(rng=random):
+    return rng.choice(['+', '-'])
+
+
+def make_question(level, rng=random):
+    a = rand_num(level, rng)
+    b = rand_num(level, rng)
+    op = pick_operator(rng)
+    if op == '-' and b > a:  # avoid negatives for now
+        a, b = b, a
+    return Question(a, op, b)
+
+
+def grade_for(score):
+    if score >= 90:
+        return "A+"
+    elif score >= 80:
+        return "A"
+    elif score >= 70:
+        return "B"
+    elif score >= 60:
+        return "C"
+    return "Needs Work"
+
+
+class QuizSession:
+    """One 10-question play at a fixed difficulty."""
+
+    def __init__(self, level, rng=None):
+        self.level = level
+        self.rng = rng or random.Random()
+        self.score = 0
+        self.number = 0          # 1-based number of the current question
+        self.current = None
+        self.attempts = 0
+        self.outcomes = []       # one CORRECT / WRONG per finished question
+        self.log = []            # one QuestionLog per finished question
+        self.attempt_log = []    # one Attempt per submitted answer
+        self._asked_at = None
+
+    @property
+    def first_try(self):
+        return self.attempts == 0
+
+    @property
+    def finished(self):
+        return self.number >= QUESTIONS and self.current is None
+
+    @property
+    def grade(self):
+        return grade_for(self.score)
+
+    def _new_question(self):
+        return make_question(self.level, self.rng)
+
+    def _on_attempt(self, attempt):
+        pass  # hook for subclasses, e.g. the adaptive session
+
+    def next_question(self):
+        # returns the next Question, or None once all 10 are done
+        if self.number >= QUESTIONS:
+            self.current = None
+            return None
+        self.number += 1
+        self.attempts = 0
+        self.current = self._new_question()
+        self._asked_at = time.perf_counter()
+        return self.current
+
+    def answer(self, value):
+        if self.current is None:
+            raise RuntimeError("no question to answer")
+        self.attempts += 1
+        attempt = Attempt(self.current, self.attempts, value == self.current.answer,
+                          time.perf_counter() - self._asked_at)
+        self.attempt_log.append(attempt)
+        self._on_attempt(attempt)
+        if attempt.correct:
+            self.score += FIRST_TRY_POINTS if self.attempts == 1 else SECOND_TRY_POINTS
+            outcome = CORRECT
+        elif self.attempts < MAX_ATTEMPTS:
+            return RETRY
+        else:
+            outcome = WRONG
+        self.outcomes.append(outcome)
+        self.log.append(QuestionLog(self.current, self.attempts, outcome,
+                                    time.perf_counter() - self._asked_at))
+        self.current = None  # question done, call next_question()
+        return outcome
@@ -0,0 +1,169 @@
+import argparse
+import csv
+import itertools
+import math
+import os
+import re
+import sys
+
+from ordered_pool import map_ordered
+from quiz_engine import CORRECT, QUESTIONS, RETRY, Question
+from quiz_pool import PooledQuizSession
+
+# ------------------ BATCH GRADER ------------------
+# Marks paper / CSV answer sheets with the exact same rules as the live quiz
+# (each sheet is replayed through a QuizSession), spread over a process pool.
+#
+# Sheet format, one student per row, header row optional:
+#   student, q1, q1_try1, q1_try2, q2, q2_try1, q2_try2, ... q10_try2
+# where qN is the question as printed ("45 + 9") and try2 is blank if try1
+# was right.
+CHUNK = 2000          # rows per worker job
+RESULT_FIELDS = ("student", "score", "grade", "first_try", "second_try", "wrong", "error")
+QUESTION_RE = re.compile(r"^\s*(\d+)\s*([+-])\s*(\d+)\s*=?\s*$")
+
+
+def parse_question(text):
+    m = QUESTION_RE.match(text)
+    if not m:
+        raise ValueError(f"can't read question {text!r}")
+    return Question(int(m.group(1)), m.group(2), int(m.group(3)))
+
+
+def _int_or_none(text):
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        return None  # scribble counts as a wrong answer
+
+
+def grade_sheet(row):
+    # -> (student, score, grade, first, second, wrong, per-question points, error)
+    student = row[0].strip() if row else ""
+    try:
+        if len(row) < 1 + QUESTIONS * 3:
+            raise ValueError(f"expected {1 + QUESTIONS * 3} columns, got {len(row)}")
+        paper, tries = [], []
+        for i in range(QUESTIONS):
+            q_text, t1, t2 = row[1 + i * 3: 4 + i * 3]
+            paper.append(parse_question(q_text))
+            tries.append((_int_or_none(t1), _int_or_none(t2)))
+    except ValueError as err:
+        return student, 0, "", 0, 0, 0, None, str(err)
+
+    s = PooledQuizSession(0, paper)
+    first = second = wrong = 0
+    points = []
+    for t1, t2 in tries:
+        s.next_question()
+        before = s.score
+        # a blank try is still a go, same as submitting nothing useful
+        outcome = s.answer(t1)
+        if outcome == RETRY:
+            outcome = s.answer(t2)
+            if outcome == CORRECT:
+                second += 1
+            else:
+                wrong += 1
+        else:
+            first += 1
+        points.append(s.score - before)
+    return student, s.score, s.grade, first, second, wrong, points, ""
+
+
+def _grade_chunk(rows):
+    return [grade_sheet(row) for row in rows if row and "".join(row).strip()]
+
+
+def is_header(row):
+    # "student, q1, ..." - checked on a file's first row only, so a student who
+    # happens to be called Student still gets graded
+    return (len(row) > 1 and row[0].strip().lower() == "student"
+            and not QUESTION_RE.match(row[1]))
+
+
+def read_sheets(paths):
+    # lazily yields csv rows from every file, minus each file's header. The
+    # parsing has to happen here: a quoted field can span lines, so raw lines
+    # can't be split between workers
+    for path in paths:
+        with open(path, encoding="utf-8", newline="") as f:
+            rows = csv.reader(f)
+            first = next(rows, None)
+            if first is not None and not is_header(first):
+                yield first
+            yield from rows
+
+
+def grade_stream(rows, workers=None):
+    """Yields graded sheets in input order, never holding more than a few chunks."""
+    rows = iter(rows)
+    chunks = iter(lambda: list(itertools.islice(rows, CHUNK)), [])
+    for graded in map_ordered(_grade_chunk, chunks, workers):
+        yield from graded
+
+
+class Aggregate:
+    def __init__(self):
+        self.n = 0
+        self.errors = 0
+        self.total = 0
+        self.total_sq = 0
+        self.grades = {}
+        self.q_points = [0] * QUESTIONS
+        self.q_first = [0] * QUESTIONS
+
+    def add(self, result):
+        student, score, grade, first, second, wrong, points, error = result
+        if error:
+            self.errors += 1
+            return
+        self.n += 1
+        self.total += score
+        self.total_sq += score * score
+        self.grades[grade] = self.grades.get(grade, 0) + 1
+        for i, p in enumerate(points):
+            self.q_points[i] += p
+            self.q_first[i] += p == 10
+
+    def report(self):
+        if not self.n:
+            return f"no valid sheets ({self.errors} rejected)"
+        mean = self.total / self.n
+        sd = math.sqrt(max(self.total_sq / self.n - mean * mean, 0))
+        lines = [f"{self.n:,} sheets graded, {self.errors:,} rejected",
+                 f"mean {mean:.2f}/100, sd {sd:.2f}",
+                 "grades: " + ", ".join(f"{g} {c:,}" for g, c in
+                                        sorted(self.grades.items(), key=lambda kv: -kv[1]))]
+        for i in range(QUESTIONS):
+            lines.append(f"  Q{i + 1:<2} avg {self.q_points[i] / self.n:5.2f} pts, "
+                         f"{self.q_first[i] / self.n * 100:5.1f}% first try")
+        return "\n".join(lines)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Grade maths quiz answer sheets in bulk.")
+    ap.add_argument("sheets", nargs="+", help="CSV answer sheet files")
+    ap.add_argument("-o", "--out", help="per-student results CSV (default: stdout)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    args = ap.parse_args()
+
+    out = open(args.out, "w", encoding="utf-8", newline="") if args.out else sys.stdout
+    agg = Aggregate()
+    try:
+        w = csv.writer(out)
+        w.writerow(RESULT_FIELDS)
+        for result in grade_stream(read_sheets(args.sheets), args.workers):
+            agg.add(result)
+            w.writerow(result[:6] + result[7:])
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(agg.report(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
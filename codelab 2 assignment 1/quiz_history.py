@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import time
+
+# ------------------ SCORE HISTORY ------------------
+# Every finished quiz goes into a small SQLite file next to the other resources.
+# Leaderboards never scan the whole history:
+#   - top N per difficulty walks the (level, score) index
+#   - personal bests live in their own table, updated on insert
+#   - ranks come from score_counts, one row per (level, score) bucket, so a
+#     rank is a sum over at most 21 rows however many sessions are stored
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY_PATH = os.path.join(BASE_DIR, "Resources", "quizHistory.db")
+
+LEVEL_NAMES = {1: "Easy", 2: "Moderate", 3: "Advanced", 4: "Adaptive"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    grade TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_board ON sessions (level, score DESC, seconds, id);
+
+CREATE TABLE IF NOT EXISTS answers (
+    session_id INTEGER NOT NULL REFERENCES sessions (id),
+    number INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    op TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    outcome TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (session_id, number)
+);
+
+CREATE TABLE IF NOT EXISTS personal_best (
+    player TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    session_id INTEGER NOT NULL,
+    PRIMARY KEY (player, level)
+);
+
+CREATE TABLE IF NOT EXISTS score_counts (
+    level INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (level, score)
+);
+"""
+
+
+class ScoreHistory:
+    def __init__(self, path=HISTORY_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def record(self, session, player):
+        """Store a finished QuizSession, returns its id."""
+        total = sum(entry.seconds for entry in session.log)
+        with self.db:   # one transaction, so the indexes never disagree
+            cur = self.db.execute(
+                "INSERT INTO sessions (player, level, score, grade, seconds, played_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (player, session.level, session.score, session.grade, total, time.time()),
+            )
+            sid = cur.lastrowid
+            self.db.executemany(
+                "INSERT INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (sid, i, e.question.text.strip(), e.question.op,
+                     e.attempts, e.outcome, e.seconds)
+                    for i, e in enumerate(session.log, 1)
+                ],
+            )
+            self.db.execute(
+                "INSERT INTO personal_best VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (player, level) DO UPDATE SET "
+                "score = excluded.score, session_id = excluded.session_id "
+                "WHERE excluded.score > personal_best.score",
+                (player, session.level, session.score, sid),
+            )
+            self.db.execute(
+                "INSERT INTO score_counts VALUES (?, ?, 1) "
+                "ON CONFLICT (level, score) DO UPDATE SET n = n + 1",
+                (session.level, session.score),
+            )
+        return sid
+
+    def top(self, level, n=5):
+        # ties: faster total time first, then whoever got there first
+        return self.db.execute(
+            "SELECT player, score, seconds FROM sessions WHERE level = ? "
+            "ORDER BY score DESC, seconds, id LIMIT ?",
+            (level, n),
+        ).fetchall()
+
+    def rank(self, level, score):
+        # (rank, out of how many) for a score at this level
+        above, total = self.db.execute(
+            "SELECT COALESCE(SUM(CASE WHEN score > ? THEN n END), 0), COALESCE(SUM(n), 0) "
+            "FROM score_counts WHERE level = ?",
+            (score, level),
+        ).fetchone()
+        return above + 1, total
+
+    def personal_best(self, player, level):
+        row = self.db.execute(
+            "SELECT score FROM personal_best WHERE player = ? AND level = ?",
+            (player, level),
+        ).fetchone()
+        return row[0] if row else None
+
+    def personal_bests(self, player):
+        return dict(self.db.execute(
+            "SELECT level, score FROM personal_best WHERE player = ? ORDER BY level",
+            (player,),
+        ).fetchall())
+
+    def rebuild_indexes(self):
+        # only needed if someone edits the sessions table by hand
+        with self.db:
+            self.db.execute("DELETE FROM score_counts")
+            self.db.execute(
+                "INSERT INTO score_counts SELECT level, score, COUNT(*) "
+                "FROM sessions GROUP BY level, score"
+            )
+            self.db.execute("DELETE FROM personal_best")
+            self.db.execute(
+                "INSERT INTO personal_best "
+                "SELECT player, level, MAX(score), MIN(id) FROM sessions s "
+                "WHERE score = (SELECT MAX(score) FROM sessions "
+                "               WHERE player = s.player AND level = s.level) "
+                "GROUP BY player, level"
+            )
+
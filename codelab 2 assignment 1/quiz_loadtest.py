@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from quiz_server import HOST, PORT
+
+# ------------------ LOAD TEST ------------------
+# Opens N concurrent connections to quiz_server.py, each one plays full quizzes
+# as fast as it can, and every request/reply round trip gets timed.
+
+
+async def fake_student(host, port, level, games, accuracy, latencies, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def call(req):
+        t = time.perf_counter()
+        writer.write(json.dumps(req).encode() + b"\n")
+        await writer.drain()
+        reply = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - t)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    try:
+        for _ in range(games):
+            await call({"op": "start", "level": level})
+            while not (q := await call({"op": "next"})).get("done"):
+                right = q["a"] + q["b"] if q["op"] == "+" else q["a"] - q["b"]
+                while True:
+                    guess = right if rng.random() < accuracy else right + 1
+                    if (await call({"op": "answer", "value": guess}))["outcome"] != "retry":
+                        break
+    finally:
+        writer.close()
+
+
+def percentile(sorted_vals, pct):
+    if not sorted_vals:
+        return 0.0
+    i = min(int(len(sorted_vals) * pct / 100), len(sorted_vals) - 1)
+    return sorted_vals[i]
+
+
+async def run(clients, games, level, accuracy, host, port, ramp):
+    latencies = []
+    rng = random.Random(0)
+    tasks = []
+    start = time.perf_counter()
+    for i in range(clients):
+        tasks.append(asyncio.create_task(
+            fake_student(host, port, level, games, accuracy, latencies, rng)))
+        if ramp and i % 100 == 99:
+            await asyncio.sleep(ramp)  # don't slam accept() with thousands at once
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    took = time.perf_counter() - start
+    failed = [r for r in results if isinstance(r, BaseException)]
+    return latencies, took, failed
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load-test quiz_server.py with simulated students.")
+    ap.add_argument("--clients", type=int, default=1000)
+    ap.add_argument("--games", type=int, default=1, help="quizzes per client")
+    ap.add_argument("--level", type=int, choices=(1, 2, 3), default=2)
+    ap.add_argument("--accuracy", type=float, default=0.8)
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--ramp", type=float, default=0.01,
+                    help="pause (s) after every 100 connections opened")
+    args = ap.parse_args()
+
+    latencies, took, failed = asyncio.run(run(
+        args.clients, args.games, args.level, args.accuracy, args.host, args.port, args.ramp))
+    lat = sorted(latencies)
+    ms = [v * 1000 for v in (percentile(lat, 50), percentile(lat, 95), percentile(lat, 99))]
+    print(f"{args.clients} clients x {args.games} games: {len(lat):,} requests in {took:.2f}s")
+    print(f"throughput {len(lat) / took:,.0f} req/s, "
+          f"{args.clients * args.games / took:,.1f} games/s")
+    print(f"latency p50 {ms[0]:.2f} ms, p95 {ms[1]:.2f} ms, p99 {ms[2]:.2f} ms, "
+          f"max {lat[-1] * 1000 if lat else 0:.2f} ms")
+    if failed:
+        print(f"{len(failed)} clients failed, e.g. {failed[0]!r}")
+
+
+if __name__ == "__main__":
+    main()
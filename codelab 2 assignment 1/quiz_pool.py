@@ -0,0 +1,177 @@
+import argparse
+import os
+import random
+import struct
+import sys
+from array import array
+
+from quiz_engine import QUESTIONS, Question, QuizSession
+
+# ------------------ QUESTION POOLS ------------------
+# Questions built ahead of time, in bulk, from a seed. Same seed -> same pool,
+# so a whole class can sit the same paper, and a pool never repeats a question.
+# A pool is stored column-wise: array of a's, array of b's, bytes of operators,
+# all little-endian. The seed is kept as an int64, any other seed still works
+# but the pool just isn't saved.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+POOL_DIR = os.path.join(BASE_DIR, "Resources", "pools")
+POOL_MAGIC = b"QPOOL1"
+BATCH = 4096   # candidates generated per pass
+
+LEVEL_RANGES = {1: (1, 9), 2: (10, 99), 3: (1000, 9999)}
+
+
+def _little_endian(arr):
+    # arrays go to disk little-endian like the header, whatever the host
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+
+def unique_questions(level):
+    # how many distinct (a, op, b) exist once negatives are swapped away
+    lo, hi = LEVEL_RANGES[level]
+    n = hi - lo + 1
+    return n * n + n * (n + 1) // 2
+
+
+class QuestionPool:
+    def __init__(self, level, seed, a, b, ops):
+        self.level = level
+        self.seed = seed
+        self.a = a          # array('i')
+        self.b = b          # array('i')
+        self.ops = ops      # bytes, b"+" / b"-" per question
+
+    def __len__(self):
+        return len(self.a)
+
+    def __getitem__(self, i):
+        return Question(self.a[i], chr(self.ops[i]), self.b[i])
+
+    def paper(self, index=0):
+        # the index-th block of 10 questions, e.g. one per student
+        start = index * QUESTIONS
+        if start + QUESTIONS > len(self):
+            raise IndexError(f"pool only has {len(self) // QUESTIONS} papers")
+        return [self[i] for i in range(start, start + QUESTIONS)]
+
+    # --- storage ---
+    def save(self, path):
+        # packed first: a seed outside int64 fails here, before any file exists
+        header = struct.pack("<iqI", self.level, self.seed, len(self))
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(POOL_MAGIC)
+            f.write(header)
+            _little_endian(array("i", self.a)).tofile(f)
+            _little_endian(array("i", self.b)).tofile(f)
+            f.write(self.ops)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            if f.read(len(POOL_MAGIC)) != POOL_MAGIC:
+                raise ValueError(f"{path} is not a question pool")
+            level, seed, n = struct.unpack("<iqI", f.read(struct.calcsize("<iqI")))
+            a, b = array("i"), array("i")
+            a.fromfile(f, n)
+            b.fromfile(f, n)
+            _little_endian(a)
+            _little_endian(b)
+            ops = f.read(n)
+        return cls(level, seed, a, b, ops)
+
+
+def build_pool(level, size, seed):
+    """Generate `size` distinct questions for `level`, reproducibly from `seed`."""
+    if size > unique_questions(level):
+        raise ValueError(f"level {level} only has {unique_questions(level)} distinct questions")
+    lo, hi = LEVEL_RANGES[level]
+    rng = random.Random(seed)
+    seen = set()
+    a_out, b_out, ops_out = array("i"), array("i"), bytearray()
+    while len(a_out) < size:
+        # one batch of candidates at a time, same no-negative swap as next_q
+        xs = [rng.randint(lo, hi) for _ in range(BATCH)]
+        ys = [rng.randint(lo, hi) for _ in range(BATCH)]
+        ops = [rng.choice(b"+-") for _ in range(BATCH)]
+        for x, y, op in zip(xs, ys, ops):
+            if op == 45 and y > x:   # 45 == ord("-")
+                x, y = y, x
+            key = (x, op, y)
+            if key in seen:
+                continue
+            seen.add(key)
+            a_out.append(x)
+            b_out.append(y)
+            ops_out.append(op)
+            if len(a_out) == size:
+                break
+    return QuestionPool(level, seed, a_out, b_out, bytes(ops_out))
+
+
+def pool_path(level, seed, size):
+    return os.path.join(POOL_DIR, f"L{level}-s{seed}-n{size}.qpool")
+
+
+def default_size(level):
+    # 100 papers, or as many as the level has distinct questions for
+    cap = unique_questions(level) // QUESTIONS * QUESTIONS
+    return min(QUESTIONS * 100, cap)
+
+
+def get_pool(level, seed, size=None):
+    # precomputed store: built once, then read straight off disk
+    size = size or default_size(level)
+    path = pool_path(level, seed, size)
+    if os.path.exists(path):
+        try:
+            return QuestionPool.load(path)
+        except (OSError, ValueError, EOFError, struct.error):
+            pass  # broken file, just rebuild it
+    pool = build_pool(level, size, seed)
+    try:
+        os.makedirs(POOL_DIR, exist_ok=True)
+        pool.save(path)
+    except (OSError, struct.error):
+        pass  # read-only folder, or a seed too big for the file -> memory only
+    return pool
+
+
+class PooledQuizSession(QuizSession):
+    """QuizSession that asks a fixed paper instead of random questions."""
+
+    def __init__(self, level, paper):
+        super().__init__(level)
+        self.paper = list(paper)
+
+    def _new_question(self):
+        return self.paper[self.number - 1]
+
+
+def class_sessions(level, seed, students, same_paper=True):
+    # one session per student: everyone on paper 0, or a distinct paper each
+    size = default_size(level)
+    if not same_paper:
+        size = max(size, students * QUESTIONS)
+    pool = get_pool(level, seed, size)
+    return [PooledQuizSession(level, pool.paper(0 if same_paper else i))
+            for i in range(students)]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Pre-build seeded maths quiz question pools.")
+    ap.add_argument("--level", type=int, choices=(1, 2, 3), required=True)
+    ap.add_argument("--seed", type=int, required=True)
+    ap.add_argument("--size", type=int, help="questions in the pool (default: 100 papers)")
+    args = ap.parse_args()
+    pool = get_pool(args.level, args.seed, args.size)
+    print(f"{len(pool)} questions -> {pool_path(args.level, args.seed, len(pool))}")
+    for q in pool.paper(0):
+        print("  ", q.text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import argparse
+import asyncio
+import json
+import socket
+import time
+
+from quiz_engine import CORRECT, WRONG, Attempt, Question, QuestionLog, QuizSession, grade_for
+
+# ------------------ QUIZ SERVER ------------------
+# Lots of students, one machine: every TCP connection gets its own QuizSession.
+# Protocol is one JSON object per line each way:
+#   {"op": "start", "level": 2}         -> {"ok": true, "level": 2}
+#   {"op": "next"}                      -> {"number": 1, "a": 4, "op": "+", "b": 5}
+#                                          or {"done": true, "score": 90, "grade": "A+"}
+#   {"op": "answer", "value": 9}        -> {"outcome": "correct", "score": 10}
+#                                          ("answer" is included once it's WRONG)
+HOST = "127.0.0.1"
+PORT = 8765
+
+
+def handle(session, req):
+    # pure request -> reply, so it's easy to poke at without sockets
+    if not isinstance(req, dict):
+        return {"error": "request must be a JSON object"}, session
+    op = req.get("op")
+    if op == "start":
+        level = req.get("level", 1)
+        # bool is an int too, but "level": true is surely a mistake
+        if type(level) is not int or level not in (1, 2, 3):
+            return {"error": "level must be 1, 2 or 3"}, session
+        return {"ok": True, "level": level}, QuizSession(level)
+    if session is None:
+        return {"error": "send start first"}, None
+    if op == "next":
+        q = session.next_question()
+        if q is None:
+            return {"done": True, "score": session.score, "grade": session.grade}, session
+        return {"number": session.number, "a": q.a, "op": q.op, "b": q.b}, session
+    if op == "answer":
+        if session.current is None:
+            return {"error": "no question to answer"}, session
+        q = session.current
+        value = req.get("value")
+        # no coercing: 3.9, true, "7" and Infinity are all just wrong input
+        if type(value) is not int:
+            return {"error": "value must be a whole number"}, session
+        outcome = session.answer(value)
+        reply = {"outcome": outcome, "score": session.score}
+        if outcome == WRONG:
+            reply["answer"] = q.answer
+        return reply, session
+    return {"error": f"unknown op {op!r}"}, session
+
+
+async def serve_client(reader, writer):
+    session = None
+    try:
+        while line := await reader.readline():
+            try:
+                req = json.loads(line)
+            except ValueError:
+                reply = {"error": "bad json"}
+            else:
+                reply, session = handle(session, req)
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def run_server(host=HOST, port=PORT):
+    server = await asyncio.start_server(serve_client, host, port, backlog=4096)
+    print(f"Quiz server on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+# ------------------ CLIENT ------------------
+class RemoteQuizSession:
+    """Same interface the Tk quiz uses on QuizSession, played on the server."""
+
+    def __init__(self, level, host=HOST, port=PORT):
+        self.level = level
+        self.sock = socket.create_connection((host, port), timeout=10)
+        self.file = self.sock.makefile("rwb")
+        self.score = 0
+        self.number = 0
+        self.current = None
+        self.attempts = 0
+        self.outcomes = []
+        self.log = []
+        self.attempt_log = []
+        self._asked_at = None
+        self._call({"op": "start", "level": level})
+
+    def _call(self, req):
+        self.file.write(json.dumps(req).encode() + b"\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("quiz server closed the connection")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    @property
+    def grade(self):
+        return grade_for(self.score)
+
+    def next_question(self):
+        reply = self._call({"op": "next"})
+        if reply.get("done"):
+            self.current = None
+            self.close()
+            return None
+        self.number = reply["number"]
+        self.attempts = 0
+        self.current = Question(reply["a"], reply["op"], reply["b"])
+        self._asked_at = time.perf_counter()
+        return self.current
+
+    def answer(self, value):
+        reply = self._call({"op": "answer", "value": value})
+        outcome = reply["outcome"]
+        self.attempts += 1
+        seconds = time.perf_counter() - self._asked_at
+        self.attempt_log.append(Attempt(self.current, self.attempts, outcome == CORRECT, seconds))
+        self.score = reply["score"]
+        if outcome in (CORRECT, WRONG):
+            self.outcomes.append(outcome)
+            self.log.append(QuestionLog(self.current, self.attempts, outcome, seconds))
+            self.current = None
+        return outcome
+
+    def close(self):
+        try:
+            self.file.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Host maths quiz sessions for many clients.")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    args = ap.parse_args()
+    try:
+        asyncio.run(run_server(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
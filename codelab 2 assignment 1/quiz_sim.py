@@ -0,0 +1,153 @@
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from quiz_engine import (QUESTIONS, FIRST_TRY_POINTS, SECOND_TRY_POINTS, MAX_SCORE,
+                         RETRY, QuizSession)
+
+# ------------------ SIMULATION HARNESS ------------------
+# Plays lots of QuizSessions with a fake player who gets each attempt right
+# with probability `accuracy`, then checks the score spread against the exact
+# distribution those rules should produce.
+CHUNK = 20000   # sessions per worker job
+
+
+def play_session(level, accuracy, rng):
+    s = QuizSession(level, rng)
+    while (q := s.next_question()) is not None:
+        # sanity: the no-negatives rule must always hold
+        if q.answer < 0:
+            raise AssertionError(f"negative answer generated: {q.text}")
+        while True:
+            guess = q.answer if rng.random() < accuracy else q.answer + 1
+            if s.answer(guess) != RETRY:
+                break
+    return s.score
+
+
+def _run_chunk(args):
+    level, accuracy, count, seed = args
+    rng = random.Random(seed)
+    hist = [0] * (MAX_SCORE // SECOND_TRY_POINTS + 1)
+    for _ in range(count):
+        hist[play_session(level, accuracy, rng) // SECOND_TRY_POINTS] += 1
+    return hist
+
+
+def simulate(sessions, level=1, accuracy=0.8, workers=None, seed=None):
+    """Histogram of final scores (index = score // 5) over `sessions` plays."""
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    jobs = []
+    left, i = sessions, 0
+    while left > 0:
+        n = min(CHUNK, left)
+        jobs.append((level, accuracy, n, seed * 100003 + i))
+        left -= n
+        i += 1
+    hist = [0] * (MAX_SCORE // SECOND_TRY_POINTS + 1)
+    if workers == 1:
+        for h in map(_run_chunk, jobs):
+            hist = [a + b for a, b in zip(hist, h)]
+        return hist
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for h in pool.map(_run_chunk, jobs):
+            hist = [a + b for a, b in zip(hist, h)]
+    return hist
+
+
+# ------------------ STATS ------------------
+def expected_distribution(accuracy):
+    # one question: 10 pts w.p. p, 5 pts w.p. (1-p)p, 0 otherwise.
+    # convolve that 10 times, in units of 5 points
+    p = accuracy
+    per_q = {FIRST_TRY_POINTS // SECOND_TRY_POINTS: p, 1: (1 - p) * p, 0: (1 - p) ** 2}
+    dist = [1.0]
+    for _ in range(QUESTIONS):
+        nxt = [0.0] * (len(dist) + 2)
+        for k, pk in enumerate(dist):
+            for step, ps in per_q.items():
+                nxt[k + step] += pk * ps
+        dist = nxt
+    return dist[:MAX_SCORE // SECOND_TRY_POINTS + 1]
+
+
+def chi_square(hist, accuracy, min_expected=5):
+    # returns (statistic, degrees of freedom, approx p-value);
+    # sparse tail bins are pooled so each bin expects >= min_expected hits
+    total = sum(hist)
+    probs = expected_distribution(accuracy)
+    bins, obs, exp = [], 0, 0.0
+    for o, pr in zip(hist, probs):
+        obs += o
+        exp += pr * total
+        if exp >= min_expected:
+            bins.append((obs, exp))
+            obs, exp = 0, 0.0
+    if bins and exp > 0:
+        o, e = bins.pop()
+        bins.append((o + obs, e + exp))
+    stat = sum((o - e) ** 2 / e for o, e in bins)
+    dof = max(len(bins) - 1, 1)
+    # Wilson-Hilferty approximation, good enough without scipy
+    z = ((stat / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+    return stat, dof, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def summarize(hist):
+    total = sum(hist)
+    mean = sum(i * SECOND_TRY_POINTS * n for i, n in enumerate(hist)) / total
+    var = sum((i * SECOND_TRY_POINTS - mean) ** 2 * n for i, n in enumerate(hist)) / total
+    return mean, math.sqrt(var)
+
+
+# ------------------ BENCHMARK ------------------
+def benchmark(level=1, accuracy=0.8, seconds=2.0):
+    # single-process engine throughput, sessions per second
+    rng = random.Random(1)
+    n, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for _ in range(1000):
+            play_session(level, accuracy, rng)
+        n += 1000
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Simulate maths quiz sessions.")
+    ap.add_argument("--sessions", type=int, default=1_000_000)
+    ap.add_argument("--level", type=int, choices=(1, 2, 3), default=1)
+    ap.add_argument("--accuracy", type=float, default=0.8,
+                    help="chance the simulated player gets an attempt right")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--seed", type=int)
+    ap.add_argument("--bench", action="store_true", help="only time the engine")
+    args = ap.parse_args()
+
+    if args.bench:
+        rate = benchmark(args.level, args.accuracy)
+        print(f"engine: {rate:,.0f} sessions/s on one core")
+        return
+
+    start = time.perf_counter()
+    hist = simulate(args.sessions, args.level, args.accuracy, args.workers, args.seed)
+    took = time.perf_counter() - start
+    mean, sd = summarize(hist)
+    exp = expected_distribution(args.accuracy)
+    exp_mean = sum(i * SECOND_TRY_POINTS * pr for i, pr in enumerate(exp))
+    stat, dof, p = chi_square(hist, args.accuracy)
+
+    print(f"{args.sessions:,} sessions in {took:.2f}s "
+          f"({args.sessions / took:,.0f}/s, {args.workers} workers)")
+    print(f"mean score {mean:.2f} (expected {exp_mean:.2f}), sd {sd:.2f}")
+    print(f"chi-square {stat:.1f} on {dof} dof, p = {p:.3f} "
+          f"-> {'OK' if p > 0.001 else 'MISMATCH'}")
+    for i, n in enumerate(hist):
+        if n:
+            print(f"  {i * SECOND_TRY_POINTS:3d}: {n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import argparse
+import csv
+import math
+import os
+import random
+import time
+
+from quiz_engine import Attempt, Question, QuizSession
+
+# ------------------ ANSWER LATENCY STATS ------------------
+# Time from a question being shown to each submit, bucketed by operator and
+# by digit count (the bigger operand's), plus how often each try was right.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATS_PATH = os.path.join(BASE_DIR, "Resources", "quizLatency.csv")
+CSV_FIELDS = ("played_at", "level", "question", "op", "digits", "attempt", "correct", "seconds")
+
+
+def digits_of(q):
+    return len(str(max(q.a, q.b)))
+
+
+class Bucket:
+    def __init__(self):
+        self.n = 0             # attempts
+        self.first_right = 0   # questions nailed on try 1
+        self.questions = 0     # questions seen (first tries)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def add(self, attempt):
+        self.n += 1
+        self.total += attempt.seconds
+        self.total_sq += attempt.seconds ** 2
+        if attempt.number == 1:
+            self.questions += 1
+            self.first_right += attempt.correct
+
+    @property
+    def mean(self):
+        return self.total / self.n if self.n else 0.0
+
+    @property
+    def stdev(self):
+        if self.n < 2:
+            return 0.0
+        return math.sqrt(max(self.total_sq / self.n - self.mean ** 2, 0.0))
+
+    @property
+    def accuracy(self):
+        return self.first_right / self.questions if self.questions else 0.0
+
+
+class LatencyStats:
+    def __init__(self):
+        self.buckets = {}   # (op, digits) -> Bucket
+
+    def add(self, attempt):
+        key = (attempt.question.op, digits_of(attempt.question))
+        self.buckets.setdefault(key, Bucket()).add(attempt)
+
+    def add_session(self, session):
+        for attempt in session.attempt_log:
+            self.add(attempt)
+
+    def bucket(self, op, digits):
+        return self.buckets.get((op, digits))
+
+    def summary(self):
+        return [
+            (op, d, b.n, b.accuracy, b.mean, b.stdev)
+            for (op, d), b in sorted(self.buckets.items())
+        ]
+
+
+def export_session(session, path=STATS_PATH):
+    # one row per attempt, appended, so analysis tools can pick it up later
+    new = not os.path.exists(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    now = time.time()
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        if new:
+            w.writerow(CSV_FIELDS)
+        for a in session.attempt_log:
+            q = a.question
+            w.writerow((f"{now:.0f}", session.level, q.text.strip(), q.op, digits_of(q),
+                        a.number, int(a.correct), f"{a.seconds:.3f}"))
+
+
+def load_exported(path=STATS_PATH):
+    stats = LatencyStats()
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            d = int(row["digits"])
+            # fake a question with the right op / digit count, that's all the buckets use
+            q = Question(10 ** (d - 1), row["op"], 10 ** (d - 1))
+            stats.add(Attempt(q, int(row["attempt"]), row["correct"] == "1",
+                              float(row["seconds"])))
+    return stats
+
+
+# ------------------ ADAPTIVE DIFFICULTY ------------------
+# Per operator, a digit count that moves up when answers are right and quick,
+# and down when they're wrong. Operators the player is weaker at come up more.
+ADAPTIVE_LEVEL = 4       # what an adaptive play is stored as in the history
+MIN_DIGITS, MAX_DIGITS = 1, 4
+FAST_SECONDS = 6.0       # right on the first try quicker than this -> harder
+
+
+class AdaptiveGenerator:
+    def __init__(self, start_digits=1, rng=None):
+        self.rng = rng or random.Random()
+        self.digits = {"+": start_digits, "-": start_digits}
+        self.stats = LatencyStats()
+
+    def _weight(self, op):
+        b = self.stats.bucket(op, self.digits[op])
+        # unseen or shaky ops get picked more, never below 25%
+        return 1.0 if b is None or b.questions == 0 else max(1.25 - b.accuracy, 0.25)
+
+    def make_question(self):
+        ops = ["+", "-"]
+        op = self.rng.choices(ops, weights=[self._weight(o) for o in ops])[0]
+        d = self.digits[op]
+        lo, hi = 10 ** (d - 1), 10 ** d - 1
+        a, b = self.rng.randint(lo, hi), self.rng.randint(lo, hi)
+        if op == "-" and b > a:  # avoid negatives, same as the normal quiz
+            a, b = b, a
+        return Question(a, op, b)
+
+    def observe(self, attempt):
+        self.stats.add(attempt)
+        op = attempt.question.op
+        if attempt.correct and attempt.number == 1 and attempt.seconds < FAST_SECONDS:
+            self.digits[op] = min(self.digits[op] + 1, MAX_DIGITS)
+        elif not attempt.correct:
+            self.digits[op] = max(self.digits[op] - 1, MIN_DIGITS)
+
+
+class AdaptiveQuizSession(QuizSession):
+    """QuizSession whose operands / operators follow the player's answers."""
+
+    def __init__(self, start_digits=1, rng=None):
+        super().__init__(ADAPTIVE_LEVEL, rng)
+        self.generator = AdaptiveGenerator(start_digits, self.rng)
+
+    def _new_question(self):
+        return self.generator.make_question()
+
+    def _on_attempt(self, attempt):
+        self.generator.observe(attempt)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Summarise exported maths quiz answer timings.")
+    ap.add_argument("path", nargs="?", default=STATS_PATH)
+    args = ap.parse_args()
+    print(f"{'op':>2} {'digits':>6} {'tries':>6} {'1st-try %':>9} {'mean s':>7} {'sd s':>6}")
+    for op, d, n, acc, mean, sd in load_exported(args.path).summary():
+        print(f"{op:>2} {d:>6} {n:>6} {acc * 100:>8.1f}% {mean:>7.2f} {sd:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import os
+import queue
+import threading
+
+# =====================
+#  SOUND FX (background loaded)
+# =====================
+# pygame import, mixer.init() and MP3 decoding all take a while, so none of it
+# happens on the Tk thread. Sounds get registered by name, a worker thread
+# does the slow bits, and play() is a silent no-op until that sound is ready
+# (or forever, if pygame / an audio device isn't there).
+#
+#   SOUNDS.register("laugh", res_path("laugh.mp3"))
+#   SOUNDS.start()
+#   SOUNDS.play("laugh")
+# Registering more effects later just queues them up on the same worker.
+
+
+class SoundBank:
+    def __init__(self):
+        self.paths = {}        # name -> file
+        self.sounds = {}       # name -> pygame Sound, filled in by the worker
+        self.available = True  # flips off if pygame / the mixer can't start
+        self._todo = queue.Queue()
+        self._thread = None
+
+    def register(self, name, path):
+        self.paths[name] = path
+        self._todo.put(name)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="sound-loader", daemon=True)
+            self._thread.start()
+
+    def _worker(self):
+        try:
+            import pygame
+            pygame.mixer.init()
+        except Exception:
+            self.available = False
+            return
+        while True:
+            name = self._todo.get()
+            path = self.paths.get(name)
+            try:
+                if path and os.path.exists(path):
+                    self.sounds[name] = pygame.mixer.Sound(path)
+            except Exception:
+                pass  # unreadable file, that effect just stays silent
+
+    def play(self, name):
+        sound = self.sounds.get(name)
+        if sound is not None:
+            try:
+                sound.play()
+            except Exception:
+                pass
+
+
+SOUNDS = SoundBank()
@@ -1,7 +1,21 @@
-from PIL import Image, ImageTk
+import time
+_T0 = time.perf_counter()   # start-up clock, before any other import (see StartupTimer)
+
+from array import array
+import argparse
+import atexit
+import csv
+import itertools
+import json
 import os
+import struct
+import sys
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
+
+# PIL is imported lazily after the first frame, see _load_background
+Image = ImageTk = None
 
 # ---------- Paths based on this file ----------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -20,43 +34,190 @@ def ensure_data_file():
 
 
 # ---------- Load / Save ----------
-def load_students():
-    ensure_data_file()
-    students = []
-    with open(DATA_PATH, "r", encoding="utf-8") as f:
-        lines = [ln.strip() for ln in f if ln.strip()]
-    if not lines:
-        return students
-    for line in lines[1:]:
-        parts = [p.strip() for p in line.split(",")]
-        if len(parts) < 6:
-            continue
-        code, name = parts[0], parts[1]
-        try:
-            c1, c2, c3 = int(parts[2]), int(parts[3]), int(parts[4])
-            exam = int(parts[5])
-        except:
-            continue
-        students.append(
-            {
+def iter_students(path=None):
+    # streams records one line at a time, the count line is skipped
+    if path is None:
+        ensure_data_file()
+    with open(path or DATA_PATH, "r", encoding="utf-8") as f:
+        first = True
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if first:
+                first = False
+                continue
+            parts = [p.strip() for p in line.split(",")]
+            if len(parts) < 6:
+                continue
+            code, name = parts[0], parts[1]
+            try:
+                c1, c2, c3 = int(parts[2]), int(parts[3]), int(parts[4])
+                exam = int(parts[5])
+            except:
+                continue
+            yield {
                 "code": code,
                 "name": name,
                 "coursework": [c1, c2, c3],
                 "exam": exam,
             }
-        )
-    return students
 
 
-def save_students(students):
+def load_students():
+    return list(iter_students())
+
+
+def save_students(students, path=None):
+    # write to a temp file then swap it in, so a crash mid-write
+    # never leaves a half-written marks file behind
     ensure_data_file()
-    with open(DATA_PATH, "w", encoding="utf-8") as f:
+    path = path or DATA_PATH
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
         f.write(str(len(students)) + "\n")
         for s in students:
             f.write(
                 f"{s['code']},{s['name']},{s['coursework'][0]},"
                 f"{s['coursework'][1]},{s['coursework'][2]},{s['exam']}\n"
             )
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# ---------- Write-behind autosave ----------
+AUTOSAVE_DELAY = 0.75   # seconds of quiet before a coalesced flush
+AUTOSAVE_RETRY_MAX = 30.0   # failed saves back off, doubling up to this
+AUTOSAVE_MAX_FAILURES = 5   # then give up until the next edit
+
+
+class WriteBehindSaver:
+    """Coalesces bursts of edits into one save on a background thread."""
+
+    def __init__(self, save=save_students, delay=AUTOSAVE_DELAY, on_error=None):
+        self.save = save
+        self.delay = delay
+        self.on_error = on_error  # called from the saver thread when it gives up
+        self._cond = threading.Condition()
+        self._write_lock = threading.RLock()   # held from taking a snapshot until it's on disk
+        self._pending = None      # latest snapshot waiting to be written
+        self._generation = 0      # bumped on every mark_dirty
+        self._written = 0         # generation currently on disk
+        self._last_mark = 0.0
+        self._closed = False
+        self._gave_up = False     # too many failures, wait for a new edit
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    @property
+    def dirty(self):
+        with self._cond:
+            return self._pending is not None
+
+    def mark_dirty(self, students):
+        # snapshot now, so later in-place edits can't tear the write
+        snap = [dict(s, coursework=list(s["coursework"])) for s in students]
+        with self._cond:
+            self._generation += 1
+            self._pending = (self._generation, snap)
+            self._last_mark = time.monotonic()
+            self._gave_up = False
+            self._cond.notify()
+
+    def _take(self):
+        pending, self._pending = self._pending, None
+        return pending
+
+    def _write(self, pending):
+        if pending is None:
+            return
+        gen, snap = pending
+        with self._write_lock:
+            # never let an older snapshot overwrite a newer one
+            if gen <= self._written:
+                return
+            self.save(snap)
+            self._written = gen
+
+    def _put_back(self, pending):
+        with self._cond:
+            # unless a newer snapshot came in meanwhile
+            if self._pending is None:
+                self._pending = pending
+
+    def _sleep(self, seconds):
+        # like time.sleep, but close() wakes it up
+        until = time.monotonic() + seconds
+        with self._cond:
+            while not self._closed and (left := until - time.monotonic()) > 0:
+                self._cond.wait(left)
+
+    def _run(self):
+        failures = 0
+        backoff = self.delay
+        while True:
+            with self._cond:
+                while (self._pending is None or self._gave_up) and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                # wait for a quiet period, each new edit restarts the clock
+                while self._pending is not None and not self._closed:
+                    left = self._last_mark + self.delay - time.monotonic()
+                    if left <= 0:
+                        break
+                    self._cond.wait(left)
+            err = None
+            with self._write_lock:
+                # take it under the write lock, so flush() can't slip in
+                # between the take and the write and return too early
+                with self._cond:
+                    pending = self._take()
+                try:
+                    self._write(pending)
+                except OSError as e:
+                    err = e
+                    self._put_back(pending)
+            if err is None:
+                failures, backoff = 0, self.delay
+            else:
+                print(f"Autosave failed: {err}", file=sys.stderr)
+                failures += 1
+                if failures >= AUTOSAVE_MAX_FAILURES:
+                    # read-only / full disk won't fix itself, stop hammering it
+                    with self._cond:
+                        self._gave_up = True
+                    failures, backoff = 0, self.delay
+                    if self.on_error is not None:
+                        self.on_error(err)
+                    continue
+                self._sleep(backoff)
+                backoff = min(backoff * 2, AUTOSAVE_RETRY_MAX)
+
+    def flush(self):
+        # the write lock also waits out a save the thread already has going
+        with self._write_lock:
+            with self._cond:
+                pending = self._take()
+            try:
+                self._write(pending)
+            except OSError:
+                self._put_back(pending)
+                raise
+
+    def close(self):
+        """Stop the thread and write what's left. Returns the error if that fails."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=5)
+        try:
+            self.flush()
+        except OSError as err:
+            print(f"Autosave failed: {err}", file=sys.stderr)
+            return err
+        return None
 
 
 # ---------- Calculations ----------
@@ -82,6 +243,187 @@ def student_grade(p):
     return "F"
 
 
+# ---------- Fuzzy search ----------
+SEARCH_MODES = ("Substring", "Fuzzy")
+FUZZY_MIN_SCORE = 0.3   # dice score below this is just noise
+FUZZY_LIMIT = 200       # never rank more rows than this
+
+
+def _trigrams(text):
+    # padded per word, so word order doesn't matter ("Shearer Alan" == "Alan Shearer")
+    grams = set()
+    for word in text.lower().split():
+        w = f"  {word} "
+        for i in range(len(w) - 2):
+            grams.add(w[i:i + 3])
+    return grams
+
+
+class TrigramIndex:
+    """Precomputed trigram -> students map for ranked fuzzy lookups."""
+
+    def __init__(self, students):
+        self.students = students
+        self.sizes = []
+        self.postings = {}
+        for i, s in enumerate(students):
+            grams = _trigrams(s["name"]) | _trigrams(s["code"])
+            self.sizes.append(len(grams))
+            for g in grams:
+                self.postings.setdefault(g, []).append(i)
+
+    def search(self, query, limit=FUZZY_LIMIT, min_score=FUZZY_MIN_SCORE):
+        q = _trigrams(query)
+        if not q:
+            return []
+        # only students sharing at least one trigram are ever touched
+        hits = {}
+        for g in q:
+            for i in self.postings.get(g, ()):
+                hits[i] = hits.get(i, 0) + 1
+        ranked = []
+        for i, shared in hits.items():
+            score = 2 * shared / (len(q) + self.sizes[i])
+            if score >= min_score:
+                ranked.append((score, i))
+        ranked.sort(key=lambda r: (-r[0], self.students[r[1]]["name"]))
+        return [self.students[i] for _, i in ranked[:limit]]
+
+
+# ---------- Export ----------
+EXPORT_COLUMNS = ("code", "name", "cw_total", "exam", "overall", "grade")
+EXPORT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".scol": "columnar"}
+EXPORT_PROGRESS_EVERY = 5000   # rows between progress callbacks
+COLUMNAR_MAGIC = b"SCOL1\n"
+COLUMNAR_GROUP = 65536         # rows per column block, caps memory use
+
+
+def export_rows(students):
+    # lazy: works the same on a list or on iter_students()
+    for s in students:
+        pct = overall_percentage(s)
+        yield (
+            s["code"],
+            s["name"],
+            coursework_total(s),
+            s["exam"],
+            pct,
+            student_grade(pct),
+        )
+
+
+def _counted(rows, progress):
+    n = 0
+    for row in rows:
+        yield row
+        n += 1
+        if progress and n % EXPORT_PROGRESS_EVERY == 0:
+            progress(n)
+    if progress:
+        progress(n)
+
+
+def _write_csv(rows, f):
+    w = csv.writer(f)
+    w.writerow(EXPORT_COLUMNS)
+    w.writerows(rows)
+
+
+def _write_jsonl(rows, f):
+    for row in rows:
+        f.write(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n")
+
+
+def _little_endian(arr):
+    # column arrays are stored little-endian like the headers, whatever the host
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+
+def _write_columnar(rows, f):
+    # tiny row-group columnar format, all little-endian:
+    #   magic, then per group: <u32 rows> and one block per column.
+    #   int columns -> array('i'), overall -> array('d'),
+    #   text columns -> array('I') byte lengths + utf-8 blob.
+    f.write(COLUMNAR_MAGIC)
+    kinds = ("s", "s", "i", "i", "d", "s")
+    while True:
+        group = list(itertools.islice(rows, COLUMNAR_GROUP))
+        if not group:
+            break
+        f.write(struct.pack("<I", len(group)))
+        for col, kind in enumerate(kinds):
+            values = [row[col] for row in group]
+            if kind == "s":
+                blobs = [v.encode("utf-8") for v in values]
+                lengths = _little_endian(array("I", (len(b) for b in blobs)))
+                f.write(struct.pack("<I", len(lengths) * lengths.itemsize))
+                lengths.tofile(f)
+                data = b"".join(blobs)
+                f.write(struct.pack("<I", len(data)))
+                f.write(data)
+            else:
+                arr = _little_endian(array(kind, values))
+                f.write(struct.pack("<I", len(arr) * arr.itemsize))
+                arr.tofile(f)
+
+
+def read_columnar(path):
+    # yields rows back out of a .scol file, one group in memory at a time
+    kinds = ("s", "s", "i", "i", "d", "s")
+    with open(path, "rb") as f:
+        if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError("not a student columnar export")
+        while True:
+            head = f.read(4)
+            if not head:
+                return
+            (count,) = struct.unpack("<I", head)
+            columns = []
+            for kind in kinds:
+                (size,) = struct.unpack("<I", f.read(4))
+                if kind == "s":
+                    lengths = array("I")
+                    lengths.frombytes(f.read(size))
+                    _little_endian(lengths)
+                    (size,) = struct.unpack("<I", f.read(4))
+                    data = f.read(size)
+                    col, pos = [], 0
+                    for n in lengths:
+                        col.append(data[pos:pos + n].decode("utf-8"))
+                        pos += n
+                else:
+                    col = array(kind)
+                    col.frombytes(f.read(size))
+                    _little_endian(col)
+                columns.append(col)
+            for i in range(count):
+                yield tuple(c[i] for c in columns)
+
+
+def export_students(students, path, fmt=None, progress=None):
+    """Stream students to csv / jsonl / columnar, returns rows written."""
+    fmt = fmt or EXPORT_FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt not in EXPORT_FORMATS.values():
+        raise ValueError(f"Unknown export format for {path}")
+    written = [0]
+
+    def _track(n):
+        written[0] = n
+        if progress:
+            progress(n)
+
+    rows = _counted(export_rows(students), _track)
+    if fmt == "columnar":
+        with open(path, "wb") as f:
+            _write_columnar(rows, f)
+    else:
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            (_write_csv if fmt == "csv" else _write_jsonl)(rows, f)
+    return written[0]
+
+
 # ---------- Helpers ----------
 def center(win, w=800, h=600):
     sw, sh = win.winfo_screenwidth(), win.winfo_screenheight()
@@ -214,40 +556,56 @@ class PopupCard(tk.Toplevel):
         btn.pack(pady=10)
 
 
+# ---------- Start-up timing ----------
+# _T0 is taken on the first lines of the file, so imports are counted. Only
+# the interpreter's own start-up before this script runs is left out.
+STARTUP_TARGET_MS = 200
+TABLE_FILL_CHUNK = 500   # treeview rows inserted per event-loop turn
+
+
+class StartupTimer:
+    """Collects start-up milestones, printed when run with --timing."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.marks = [("imports done", time.perf_counter())]
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter()))
+
+    def report(self):
+        if not self.enabled:
+            return
+        print("Start-up timing (ms since the script started, imports included):", file=sys.stderr)
+        for label, t in self.marks:
+            print(f"  {(t - _T0) * 1000:8.1f}  {label}", file=sys.stderr)
+        usable = next((t for label, t in self.marks if label == "first frame"), None)
+        if usable is not None:
+            ms = (usable - _T0) * 1000
+            verdict = "OK" if ms <= STARTUP_TARGET_MS else "over target"
+            print(f"  usable window in {ms:.1f} ms "
+                  f"(target {STARTUP_TARGET_MS} ms, {verdict}; "
+                  f"interpreter start-up not included)", file=sys.stderr)
+
+
 # ---------- Main App ----------
 class StudentManagerApp:
-    def __init__(self, root):
+    def __init__(self, root, timer=None):
         self.root = root
+        self.timer = timer or StartupTimer()
         self.root.title("Student Manager — Red-Black GUI")
         center(self.root, 980, 600)
         self.root.configure(bg="black")  # covered by bg image
 
-        # ----- Dynamic Fullscreen Background Image -----
-        self.original_bg = Image.open(BG_PATH)
-
-        self.bg_label = tk.Label(self.root)
+        # bg label goes in first (bottom of the stacking order), the image
+        # itself is loaded after the first frame - PIL import + resize is
+        # the slowest part of start-up
+        self.original_bg = None
+        self.bg_photo = None
+        self.bg_size = None
+        self.bg_label = tk.Label(self.root, bg="black")
         self.bg_label.place(x=0, y=0, relwidth=1, relheight=1)
 
-        def _resize_bg(event):
-            # ignore weird tiny events
-            if event.width <= 0 or event.height <= 0:
-                return
-            resized = self.original_bg.resize((event.width, event.height))
-            self.bg_photo = ImageTk.PhotoImage(resized)
-            self.bg_label.config(image=self.bg_photo)
-
-        # Bind window resize to background redraw
-        self.root.bind("<Configure>", _resize_bg)
-
-        # Force one initial draw
-        self.root.update_idletasks()
-        w = self.root.winfo_width()
-        h = self.root.winfo_height()
-        if w > 0 and h > 0:
-            resized = self.original_bg.resize((w, h))
-            self.bg_photo = ImageTk.PhotoImage(resized)
-            self.bg_label.config(image=self.bg_photo)
-
         # Use root grid directly
         self.root.rowconfigure(4, weight=1)
         self.root.columnconfigure(0, weight=1)
@@ -270,13 +628,75 @@ class StudentManagerApp:
             font=F_SUBHEADER,
         )
 
-        self.students = load_students()
+        self.students = []
+        self.search_index = None
         self.sort_asc = True
+        self._fill_job = None
+
+        # edits are written behind, always flushed on close / exit
+        self.saver = WriteBehindSaver(on_error=self._autosave_failed)
+        atexit.register(self.saver.close)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self.build_heading()
         self.build_dashboard()
         self.build_ui()
+        self.timer.mark("widgets built")
+
+        # skeleton is up - data and background follow once it's on screen
+        self.root.after_idle(self._after_first_frame)
+
+    # ---------- Deferred start-up ----------
+    def _after_first_frame(self):
+        self.root.update_idletasks()
+        self.timer.mark("first frame")
         self.refresh_summary()
+        self.timer.mark("data loaded")
+        # bg waits until the table fill has had its go at the event loop
+        self.root.after(1, self._load_background)
+
+    def _load_background(self):
+        global Image, ImageTk
+        try:
+            from PIL import Image, ImageTk
+            self.original_bg = Image.open(BG_PATH)
+        except (ImportError, OSError):
+            self.timer.mark("background skipped")
+            self.timer.report()
+            return
+        self.timer.mark("PIL + bg.png loaded")
+        self._draw_bg(self.root.winfo_width(), self.root.winfo_height())
+        # only the toplevel's own resizes matter, children bubble up here too
+        self.root.bind(
+            "<Configure>",
+            lambda e: e.widget is self.root and self._draw_bg(e.width, e.height),
+        )
+        self.timer.mark("background drawn")
+        self.timer.report()
+
+    def _draw_bg(self, w, h):
+        # ignore weird tiny events and repeats of the same size
+        if w <= 1 or h <= 1 or (w, h) == self.bg_size:
+            return
+        self.bg_size = (w, h)
+        resized = self.original_bg.resize((w, h))
+        self.bg_photo = ImageTk.PhotoImage(resized)
+        self.bg_label.config(image=self.bg_photo)
+
+    def _autosave_failed(self, err):
+        # saver thread -> hand it over to the Tk loop
+        try:
+            self.root.after(0, messagebox.showerror, "Autosave Failed",
+                            f"Changes could not be saved:\n{err}\n\n"
+                            "They will be retried after your next edit.")
+        except (RuntimeError, tk.TclError):
+            pass  # window already gone
+
+    def on_close(self):
+        err = self.saver.close()
+        if err is not None:
+            messagebox.showerror("Save Failed", f"Your last changes could not be saved:\n{err}")
+        self.root.destroy()
 
     # ---------- Heading ----------
     def build_heading(self):
@@ -383,7 +803,9 @@ class StudentManagerApp:
     def build_ui(self):
         # Search
         self.search_var = tk.StringVar()
-        self.search_var.trace_add("write", lambda *a: self.refresh_summary())
+        self.search_var.trace_add("write", lambda *a: self.populate_table())
+        self.search_mode = tk.StringVar(value=SEARCH_MODES[0])
+        self.search_mode.trace_add("write", lambda *a: self.populate_table())
         search = tk.Frame(self.root, bg=self.root["bg"])
         search.grid(row=2, column=0, sticky="w", padx=20)
         tk.Label(
@@ -406,6 +828,18 @@ class StudentManagerApp:
             highlightcolor=PRIMARY,
         )
         e.pack(side="left", padx=8, ipady=6)
+        for mode in SEARCH_MODES:
+            tk.Radiobutton(
+                search,
+                text=mode,
+                value=mode,
+                variable=self.search_mode,
+                fg=TEXT,
+                bg=self.root["bg"],
+                selectcolor=SEARCH_BG,
+                activebackground=self.root["bg"],
+                font=F_LABEL,
+            ).pack(side="left", padx=4)
 
         # Buttons
         btn_frame = tk.Frame(self.root, bg=self.root["bg"])
@@ -419,6 +853,7 @@ class StudentManagerApp:
             ("Add", self.add_student),
             ("Delete", self.delete_student),
             ("Update", self.update_student),
+            ("Export", self.export_view),
             ("Refresh", self.refresh_data),
         ]
         for txt, cmd in buttons:
@@ -467,14 +902,53 @@ class StudentManagerApp:
         self.footer.grid(row=5, column=0, sticky="ew")
 
     # ---------- Refresh summary ----------
-    def refresh_summary(self):
-        self.students = load_students()
+    def refresh_summary(self, reload=True):
+        # edits pass reload=False, memory is the source of truth until the
+        # autosave thread catches up
+        if reload:
+            self.students = load_students()
+        self.search_index = None  # rebuilt lazily on the next fuzzy search
+        self.populate_table()
+        self.refresh_dashboard()
+        avg = (
+            round(
+                sum(overall_percentage(s) for s in self.students)
+                / len(self.students),
+                2,
+            )
+            if self.students
+            else 0
+        )
+        self.footer.config(
+            text=f"Total Students: {len(self.students)}    Average Overall %: {avg}%"
+        )
+
+    # ---------- Table (search filter) ----------
+    def filtered_students(self):
         q = self.search_var.get().lower().strip()
+        if not q:
+            return self.students
+        if self.search_mode.get() == "Fuzzy":
+            if self.search_index is None:
+                self.search_index = TrigramIndex(self.students)
+            return self.search_index.search(q)
+        return [s for s in self.students if q in s["name"].lower() or q in s["code"]]
+
+    def populate_table(self):
+        # big views are filled a chunk per event-loop turn so the window
+        # keeps responding; a newer fill cancels the one in flight
+        if self._fill_job is not None:
+            self.root.after_cancel(self._fill_job)
+            self._fill_job = None
         self.tv.delete(*self.tv.get_children())
-        for s in self.students:
+        rows = iter(self.filtered_students())
+        self._fill_chunk(rows)
+
+    def _fill_chunk(self, rows):
+        self._fill_job = None
+        n = 0
+        for s in itertools.islice(rows, TABLE_FILL_CHUNK):
             pct = overall_percentage(s)
-            if q and q not in s["name"].lower() and q not in s["code"]:
-                continue
             self.tv.insert(
                 "",
                 "end",
@@ -488,19 +962,9 @@ class StudentManagerApp:
                     student_grade(pct),
                 ),
             )
-        self.refresh_dashboard()
-        avg = (
-            round(
-                sum(overall_percentage(s) for s in self.students)
-                / len(self.students),
-                2,
-            )
-            if self.students
-            else 0
-        )
-        self.footer.config(
-            text=f"Total Students: {len(self.students)}    Average Overall %: {avg}%"
-        )
+            n += 1
+        if n == TABLE_FILL_CHUNK:
+            self._fill_job = self.root.after(1, self._fill_chunk, rows)
 
     # ---------- Core Actions ----------
     def view_individual(self):
@@ -528,8 +992,8 @@ class StudentManagerApp:
             reverse=self.sort_asc,
         )
         self.sort_asc = not self.sort_asc
-        save_students(self.students)
-        self.refresh_summary()
+        self.saver.mark_dirty(self.students)
+        self.refresh_summary(reload=False)
 
     # ---------- Popups ----------
     def show_student(self, code):
@@ -621,8 +1085,8 @@ class StudentManagerApp:
         self.students.append(
             {"code": code, "name": name, "coursework": cw, "exam": exam}
         )
-        save_students(self.students)
-        self.refresh_summary()
+        self.saver.mark_dirty(self.students)
+        self.refresh_summary(reload=False)
 
     def update_student(self):
         sel = self.tv.selection()
@@ -654,8 +1118,8 @@ class StudentManagerApp:
             )
             return
         s.update({"name": res["Name"], "coursework": cw, "exam": exam})
-        save_students(self.students)
-        self.refresh_summary()
+        self.saver.mark_dirty(self.students)
+        self.refresh_summary(reload=False)
 
     def delete_student(self):
         sel = self.tv.selection()
@@ -664,12 +1128,49 @@ class StudentManagerApp:
             return
         if messagebox.askyesno("Confirm Delete", "Delete selected student?"):
             self.students = [s for s in self.students if s["code"] != sel[0]]
-            save_students(self.students)
-            self.refresh_summary()
+            self.saver.mark_dirty(self.students)
+            self.refresh_summary(reload=False)
 
     def refresh_data(self):
+        # pending edits hit the disk before we re-read it
+        try:
+            self.saver.flush()
+        except OSError as err:
+            messagebox.showerror("Save Failed", str(err))
+            return
         self.refresh_summary()
 
+    # ---------- Export ----------
+    def export_view(self):
+        path = filedialog.asksaveasfilename(
+            parent=self.root,
+            title="Export current view",
+            defaultextension=".csv",
+            filetypes=[
+                ("CSV", "*.csv"),
+                ("JSON Lines", "*.jsonl"),
+                ("Columnar (binary)", "*.scol"),
+            ],
+        )
+        if not path:
+            return
+
+        # progress borrows the footer, it gets its own text back after
+        footer_text = self.footer.cget("text")
+
+        def progress(n):
+            self.footer.config(text=f"Exporting... {n} rows")
+            self.root.update_idletasks()
+
+        try:
+            n = export_students(self.filtered_students(), path, progress=progress)
+        except (OSError, ValueError) as err:
+            messagebox.showerror("Export Failed", str(err))
+            return
+        finally:
+            self.footer.config(text=footer_text)
+        messagebox.showinfo("Export", f"Exported {n} students to\n{path}")
+
     # ---------- View All ----------
     def open_all_popup(self):
         p = PopupCard(self.root, "All Students", 600, 400)
@@ -707,8 +1208,41 @@ class StudentManagerApp:
         p.wait_window()
 
 
+# ---------- Headless export ----------
+def export_main(argv):
+    ap = argparse.ArgumentParser(description="Export student results without the GUI.")
+    ap.add_argument("--export", metavar="PATH", required=True,
+                    help="output file (.csv, .jsonl or .scol)")
+    ap.add_argument("--format", choices=sorted(set(EXPORT_FORMATS.values())))
+    ap.add_argument("--data", default=None, help="marks file (default: Resources/studentMarks.txt)")
+    ap.add_argument("--search", default="", help="name/code filter, same as the search box")
+    ap.add_argument("--fuzzy", action="store_true", help="use fuzzy search (loads all rows)")
+    ap.add_argument("--sort", choices=("asc", "desc"), help="sort by overall %% (loads all rows)")
+    args = ap.parse_args(argv)
+
+    students = iter_students(args.data)
+    q = args.search.lower().strip()
+    if q and args.fuzzy:
+        students = TrigramIndex(list(students)).search(q, limit=None)
+    elif q:
+        students = (s for s in students if q in s["name"].lower() or q in s["code"])
+    if args.sort:
+        students = sorted(students, key=overall_percentage, reverse=args.sort == "desc")
+
+    def progress(n):
+        print(f"\r{n} rows", end="", file=sys.stderr, flush=True)
+
+    n = export_students(students, args.export, args.format, progress)
+    print(f"\rExported {n} rows to {args.export}", file=sys.stderr)
+
+
 # ---------- Run ----------
 if __name__ == "__main__":
+    if "--export" in sys.argv[1:]:
+        export_main(sys.argv[1:])
+        sys.exit(0)
+    timer = StartupTimer(enabled="--timing" in sys.argv[1:])
     root = tk.Tk()
-    app = StudentManagerApp(root)
+    timer.mark("Tk root created")
+    app = StudentManagerApp(root, timer)
     root.mainloop()